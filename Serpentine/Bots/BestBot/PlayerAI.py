@@ -71,7 +71,7 @@ class PlayerAI:
         self.map_edges = [(x, y) for x in range(1, self.width-1) for y in range(1, self.height-1) \
                                   if self.world.is_edge((x,y))]
 
-        self.randomized_directions = Direction.ORDERED_DIRECTIONS
+        self.randomized_directions = list(Direction.ORDERED_DIRECTIONS)
 
     def random_shortest_path(self, start, end, avoid):
             """ Refactoring of provided get_shortest_path function to give a random route rather than straight line
@@ -92,11 +92,11 @@ class PlayerAI:
             while not queue.is_empty():
                 current = queue.poll()
 
-                neighbours = self.world.get_neighbours(current)
+                neighbours = self.world.get_open_neighbours(current)
                 random.shuffle(self.randomized_directions)
                 for direction in self.randomized_directions:
-                    neighbour = neighbours[direction]
-                    if self.world.is_wall(neighbour) or (avoid and (neighbour in avoid)):
+                    neighbour = neighbours.get(direction)
+                    if neighbour is None or (avoid and (neighbour in avoid)):
                         continue
                     cost = movement_costs[current] + 1
                     if (neighbour not in movement_costs) or (cost < movement_costs[neighbour]):
@@ -137,10 +137,10 @@ class PlayerAI:
         while not queue.is_empty():
             current = queue.poll()
 
-            neighbours = self.world.get_neighbours(current)
+            neighbours = self.world.get_open_neighbours(current)
             for direction in self.direction_preference:
-                neighbour = neighbours[direction]
-                if self.world.is_wall(neighbour) or (avoid and (neighbour in avoid)):
+                neighbour = neighbours.get(direction)
+                if neighbour is None or (avoid and (neighbour in avoid)):
                     continue
                 cost = movement_costs[current] + 1
                 if (neighbour not in movement_costs) or (cost < movement_costs[neighbour]):
@@ -165,9 +165,7 @@ class PlayerAI:
     def get_valid_neighbor_coords(self, cur_coord):
         """ get valid neighbor point coordinates from current tile coordinate
         """
-        neighbor_coords = list(self.world.get_neighbours(cur_coord).values())
-        neighbor_coords = [coord for coord in neighbor_coords if not self.world.is_wall(coord)]
-        return neighbor_coords
+        return list(self.world.get_open_neighbours(cur_coord).values())
 
     def update_members(self, world, friendly_unit, enemy_units):
         """ called on every turn - updates the class members in an FSM style
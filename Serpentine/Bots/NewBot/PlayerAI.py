@@ -47,9 +47,7 @@ class PlayerAI:
     def get_valid_neighbor_coords(self, world, cur_coord):
         """ get valid neighbor point coordinates from current tile coordinate
         """
-        neighbor_coords = list(world.get_neighbours(cur_coord).values())
-        neighbor_coords = [coord for coord in neighbor_coords if not world.is_wall(coord)]
-        return neighbor_coords
+        return list(world.get_open_neighbours(cur_coord).values())
 
 
     def attractor_func(self, distance):
@@ -130,9 +128,9 @@ class PlayerAI:
         """
         directions = []
         coord = friendly_unit.position
-        neighbors = world.get_neighbours(coord)
+        neighbors = world.get_open_neighbours(coord)
         for direc, next_coord in neighbors.items():
-            if world.is_wall(next_coord) or next_coord in friendly_unit.body:
+            if next_coord in friendly_unit.body:
                 continue 
             # up 
             if direc == Direction.NORTH:
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import socket
+import threading
+
+import PythonClientAPI.comm.CommunicationConstants as cc
+import PythonClientAPI.config.Constants as constants
+from PythonClientAPI.comm.AIWorker import AIWorker, WORKER_MODES
+from PythonClientAPI.comm.ClientChannelHandler import ClientChannelHandler, STRING_ENCODING
+from PythonClientAPI.comm.ClientHandlerProtocol import ClientHandlerProtocol
+from PythonClientAPI.simulation.MockServer import MockServer
+
+UUID = 'Red'
+
+
+class SplitSendChannelHandler(ClientChannelHandler):
+    # Previous framing: the length prefix and the body are sent with two sendall calls
+    def send_message(self, message):
+        self.check_socket_connection()
+        byte_encoded_message = message.encode(STRING_ENCODING)
+        self.sock.sendall(len(byte_encoded_message).to_bytes(4, 'big'))
+        self.sock.sendall(byte_encoded_message)
+
+
+class NagleChannelHandler(ClientChannelHandler):
+    def start_socket_connection(self, port_number, host_name):
+        super().start_socket_connection(port_number, host_name)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 0)
+
+
+class SplitSendNagleChannelHandler(SplitSendChannelHandler, NagleChannelHandler):
+    pass
+
+
+MODES = {'split-nagle': SplitSendNagleChannelHandler,
+         'split-nodelay': SplitSendChannelHandler,
+         'single-nagle': NagleChannelHandler,
+         'single-nodelay': ClientChannelHandler}
+
+
+class RandomPlayerAI:
+    # Answers instantly so that the measured time is the protocol's
+    def __init__(self):
+        self.random = random.Random(0)
+
+    def do_move(self, world, friendly_unit, enemy_units):
+        moves = [point for point in world.get_open_neighbours(friendly_unit.position).values()
+                 if point not in friendly_unit.body]
+        if moves:
+            friendly_unit.move(self.random.choice(moves))
+
+
+def get_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((cc.HOST_NAME, 0))
+        return sock.getsockname()[1]
+
+
+def run_benchmark(channel_handler_class, bitmap_file, turns, games, worker_mode=None):
+    port = get_free_port()
+    server = MockServer(bitmap_file, turns, seed=0)
+    server_thread = threading.Thread(target=asyncio.run, args=(server.serve(cc.HOST_NAME, port, games),))
+    server_thread.start()
+
+    class BenchmarkClientHandlerProtocol(ClientHandlerProtocol):
+        def start_connection(self):
+            self.client_channel_handler = channel_handler_class()
+            self.client_channel_handler.start_socket_connection(cc.PORT_NUMBER, cc.HOST_NAME)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for game in range(games):
+            ai_worker = None
+            if worker_mode is not None:
+                ai_worker = AIWorker(RandomPlayerAI(), worker_mode)
+                ai_worker.start()
+            for attempt in range(50):
+                protocol = BenchmarkClientHandlerProtocol(RandomPlayerAI(), port, 600, UUID, ai_worker)
+                protocol.start_connection()
+                if protocol.client_channel_handler.connected:
+                    break
+                threading.Event().wait(0.1)
+            protocol.game_is_ongoing = True
+            protocol.communication_protocol()
+    server_thread.join()
+    return server.get_summary(cc.MAXIMUM_ALLOWED_RESPONSE_TIME)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measures the round trip of next_move_from_client against the "
+                                                 "mock server, for each way of framing and sending messages.")
+    parser.add_argument('-m', '--map', default='Standard', help="map in Maps/ (or path of a map bitmap) to simulate")
+    parser.add_argument('-t', '--turns', type=int, default=300, help="number of turns per game")
+    parser.add_argument('-g', '--games', type=int, default=3, help="number of games per mode")
+    parser.add_argument('-w', '--worker', choices=WORKER_MODES, default=None,
+                        help="play the turns in an AIWorker of this mode rather than a new thread every turn")
+    parser.add_argument('modes', nargs='*', default=sorted(MODES),
+                        help="modes to measure among {0}, defaults to all of them".format(", ".join(sorted(MODES))))
+    args = parser.parse_args()
+    for mode in args.modes:
+        if mode not in MODES:
+            parser.error("unknown mode {0}".format(mode))
+
+    constants.LOCAL_PLAYER_UUID = UUID
+    constants.MAP_NAME = ""
+    bitmap_file = args.map if os.path.isfile(args.map) else os.path.join(os.getcwd(), 'Maps', args.map + '.bmp')
+
+    for mode in args.modes:
+        summary = run_benchmark(MODES[mode], bitmap_file, args.turns, args.games, args.worker)
+        round_trip = summary['round_trip_ms']
+        print("{0:>15}: {1} turns, p50 {2:.2f} ms, p95 {3:.2f} ms, p99 {4:.2f} ms, max {5:.2f} ms, {6} failed".format(
+            mode, summary['turns'], round_trip['p50'], round_trip['p95'], round_trip['p99'], round_trip['max'],
+            summary['failed']))
@@ -0,0 +1,29 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+from PythonClientAPI.navigation.NavigationCacheCompiler import compile_map
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compiles the navigation cache (.nac) of map bitmaps.")
+    parser.add_argument('bitmaps', nargs='*',
+                        help="map bitmaps to compile, defaults to every Maps/*.bmp without a .nac")
+    parser.add_argument('-p', '--processes', type=int, default=None,
+                        help="number of worker processes, defaults to every core")
+    parser.add_argument('-f', '--force', action='store_true', help="recompile maps that already have a .nac")
+    args = parser.parse_args()
+
+    bitmaps = args.bitmaps or sorted(glob.glob(os.path.join(os.getcwd(), 'Maps', '*.bmp')))
+    if not bitmaps:
+        print("No map bitmaps found")
+        sys.exit(1)
+
+    for bitmap in bitmaps:
+        target = os.path.splitext(bitmap)[0] + ".nac"
+        if os.path.isfile(target) and not (args.force or args.bitmaps):
+            continue
+        start_time = time.time()
+        compile_map(bitmap, target, args.processes)
+        print("Compiled {0} in {1} ms".format(target, round((time.time() - start_time) * 1000)))
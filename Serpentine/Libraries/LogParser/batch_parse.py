@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import glob
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from parse_log import TEAMS, bin_to_json, bin_to_columns
+from replay_index import INDEX_EXTENSION, ReplayIndex, build_index, write_index
+
+OUTPUT_FORMATS = {'json': ('.json', bin_to_json), 'columns': ('.col', bin_to_columns), 'none': (None, None)}
+SUMMARY_NAME = 'summary.json'
+# Files batch_parse writes, skipped in directories so an output directory inside the inputs is not parsed again
+OUTPUT_EXTENSIONS = tuple(sorted({extension for extension, _ in OUTPUT_FORMATS.values() if extension} |
+                                 {INDEX_EXTENSION, os.path.splitext(SUMMARY_NAME)[1]}))
+
+
+def find_logs(inputs):
+    # Every log named by the inputs, each being a log, a directory of logs or a glob pattern.
+    # Files of a directory with an extension batch_parse writes (see OUTPUT_EXTENSIONS) are not logs
+    logs = []
+    seen = set()
+    for name in inputs:
+        if os.path.isdir(name):
+            names = [os.path.join(name, entry) for entry in sorted(os.listdir(name))
+                     if not entry.endswith(OUTPUT_EXTENSIONS)]
+        else:
+            names = sorted(glob.glob(name)) or [name]
+        for log_name in names:
+            path = os.path.abspath(log_name)
+            if os.path.isfile(log_name) and path not in seen:
+                seen.add(path)
+                logs.append(log_name)
+    return logs
+
+
+def get_output_names(logs):
+    # Output name of every log, unique so logs of the same name (e.g. run1/game.log and run2/game.log) do not
+    # overwrite each other: its path relative to the directory common to every log, without the extension and
+    # with '_' between directories, followed by a number if another log already has that name
+    directories = [os.path.dirname(os.path.abspath(log_name)) for log_name in logs]
+    try:
+        root = os.path.commonpath(directories) if directories else ''
+    except ValueError:
+        # Logs on different drives, only their file names are kept
+        root = None
+    output_names = {}
+    used = set()
+    for log_name, directory in zip(logs, directories):
+        base_name = os.path.splitext(os.path.basename(log_name))[0]
+        if root is not None and directory != root:
+            base_name = os.path.relpath(directory, root).replace(os.sep, '_') + '_' + base_name
+        output_name = base_name
+        count = 1
+        while output_name in used:
+            count += 1
+            output_name = '{0}_{1}'.format(base_name, count)
+        used.add(output_name)
+        output_names[log_name] = output_name
+    return output_names
+
+
+def summarize_index(index):
+    # Game length, final territory of every team and the kills and deaths of every team
+    replay = ReplayIndex(index)
+    return {'turns': replay.turns,
+            'width': index['width'],
+            'height': index['height'],
+            'territory': replay.get_final_territory(),
+            'kills': {team: len(replay.get_kill_turns(team)) for team in TEAMS},
+            'deaths': {team: len(replay.get_death_turns(team)) for team in TEAMS}}
+
+
+def process_log(log_name, output_name, output_directory, output_format):
+    # Runs in a worker process: indexes, converts and summarizes one log, reporting failures instead of raising them
+    try:
+        extension, convert = OUTPUT_FORMATS[output_format]
+        target = os.path.join(output_directory, output_name)
+        index = build_index(log_name)
+        summary = summarize_index(index)
+        summary['index'] = target + INDEX_EXTENSION
+        write_index(index, summary['index'])
+        if convert:
+            summary['output'] = target + extension
+            convert(log_name, summary['output'])
+    except Exception as e:
+        return {'log': log_name, 'error': '{0}: {1}'.format(type(e).__name__, e),
+                'traceback': traceback.format_exc()}
+    summary['log'] = log_name
+    return summary
+
+
+def aggregate(results):
+    # Totals over every log that was processed successfully
+    games = [result for result in results if 'error' not in result]
+    totals = {'games': len(games),
+              'failed': len(results) - len(games),
+              'turns': sum(game['turns'] for game in games),
+              'wins': dict.fromkeys(TEAMS, 0),
+              'territory': dict.fromkeys(TEAMS, 0),
+              'kills': dict.fromkeys(TEAMS, 0),
+              'deaths': dict.fromkeys(TEAMS, 0)}
+    for game in games:
+        for key in ('territory', 'kills', 'deaths'):
+            for team in TEAMS:
+                totals[key][team] += game[key][team]
+        most = max(game['territory'].values())
+        if most > 0:
+            # Games with a tie for the most territory count as a win for every team in the tie
+            for team in TEAMS:
+                if game['territory'][team] == most:
+                    totals['wins'][team] += 1
+    totals['average_turns'] = totals['turns'] / len(games) if games else 0
+    return totals
+
+
+def batch_parse(inputs, output_directory, output_format='json', processes=None):
+    logs = find_logs(inputs)
+    output_names = get_output_names(logs)
+    os.makedirs(output_directory, exist_ok=True)
+    results = []
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(process_log, log_name, output_names[log_name], output_directory, output_format)
+                   for log_name in logs]
+        for future in as_completed(futures):
+            result = future.result()
+            if 'error' in result:
+                print('Failed to parse {0}: {1}'.format(result['log'], result['error']))
+            else:
+                print('Parsed {0} ({1} turns)'.format(result['log'], result['turns']))
+            results.append(result)
+
+    positions = {log_name: position for position, log_name in enumerate(logs)}
+    results.sort(key=lambda result: positions[result['log']])
+    summary = {'total': aggregate(results), 'logs': results}
+    with open(os.path.join(output_directory, SUMMARY_NAME), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parses many replay logs in parallel and summarizes them.")
+    parser.add_argument('logs', nargs='+', help="logs, directories of logs or glob patterns")
+    parser.add_argument('-o', '--output', default='parsed', help="directory of the parsed logs and " + SUMMARY_NAME)
+    parser.add_argument('-f', '--format', choices=sorted(OUTPUT_FORMATS), default='json',
+                        help="output written for every log, none to only summarize")
+    parser.add_argument('-p', '--processes', type=int, default=None,
+                        help="number of worker processes, defaults to every core")
+    args = parser.parse_args()
+
+    total = batch_parse(args.logs, args.output, args.format, args.processes)['total']
+    print('{0} games parsed, {1} failed, {2:.1f} turns on average'.format(
+        total['games'], total['failed'], total['average_turns']))
+    for team in TEAMS:
+        print('{0}: {1} wins, {2} tiles, {3} kills, {4} deaths'.format(
+            team, total['wins'][team], total['territory'][team], total['kills'][team], total['deaths'][team]))
+    sys.exit(1 if total['failed'] else 0)
@@ -1,91 +1,272 @@
+import os
 import sys
 import json
+import mmap
+import struct
+
+TEAMS = ['red', 'blue', 'green', 'purple']
+TURNS_PER_CHUNK = 256
+
+# Columnar replay file: a header, then the owner planes of every turn, then the body planes of every turn,
+# then the (x, y) unit position of every team on every turn, (255, 255) meaning no unit.
+# Planes hold (team index + 1) per tile in log order, so any range of turns is one contiguous slice of each block.
+COLUMNS_MAGIC = b'SRPC'
+COLUMNS_VERSION = 1
+COLUMNS_HEADER = struct.Struct('<4sBBBBI')
+NO_UNIT = 255
+
+# Every tile of a turn is one byte: bits 6-5 hold what is on the tile (01 unit, 10 body),
+# bits 4-3 the team of that unit or body, and bits 2-0 the owner of the tile (2 to 5 for red to purple).
+# The tables below map a tile byte to (team index + 1) of its owner, body and unit, 0 meaning none.
+OWNER_TABLE = bytes((byte & 7) - 1 if 2 <= (byte & 7) <= 5 else 0 for byte in range(256))
+BODY_TABLE = bytes(((byte >> 3) & 3) + 1 if (byte >> 5) & 3 == 2 else 0 for byte in range(256))
+UNIT_TABLE = bytes(((byte >> 3) & 3) + 1 if (byte >> 5) & 3 == 1 else 0 for byte in range(256))
+
 
 def read_binary(log_name):
     with open(log_name, 'rb') as f:
-        bytes = f.read()
-    bits = []
-    for byte in bytes:
-        bits.append(bin(byte)[2:].zfill(8))
-    return bits
-
-def parse(bits):
-    MAP_WIDTH = int(bits[-2], 2)
-    MAP_HEIGHT = int(bits[-1], 2)
-
-    tile_count = 0
-    turn_count = -1
-
-    rterr, bterr, gterr, pterr = {}, {}, {}, {}
-    rbody, bbody, gbody, pbody = {}, {}, {}, {}
-    runit, bunit, gunit, punit = {}, {}, {}, {}
-
-    for bit in bits[:-2]:
-        if tile_count % (MAP_WIDTH * MAP_HEIGHT) == 0:
-            tile_count = 0
-            turn_count += 1
-            rterr[turn_count] = []
-            bterr[turn_count] = []
-            gterr[turn_count] = []
-            pterr[turn_count] = []
-            rbody[turn_count] = []
-            bbody[turn_count] = []
-            gbody[turn_count] = []
-            pbody[turn_count] = []
-            runit[turn_count] = (-1, -1)
-            bunit[turn_count] = (-1, -1)
-            gunit[turn_count] = (-1, -1)
-            punit[turn_count] = (-1, -1)
-
-        magic_tuple = (tile_count // MAP_WIDTH, tile_count - MAP_WIDTH * (tile_count // MAP_WIDTH))
-
-        if bit[5:] == '010':
-            rterr[turn_count].append(magic_tuple)
-        elif bit[5:] == '011':
-            bterr[turn_count].append(magic_tuple)
-        elif bit[5:] == '100':
-            gterr[turn_count].append(magic_tuple)
-        elif bit[5:] == '101':
-            pterr[turn_count].append(magic_tuple)
-
-        if bit[1:3] == '10':
-            if bit[3:5] == '00':
-                rbody[turn_count].append(magic_tuple)
-            elif bit[3:5] == '01':
-                bbody[turn_count].append(magic_tuple)
-            elif bit[3:5] == '10':
-                gbody[turn_count].append(magic_tuple)
-            elif bit[3:5] == '11':
-                pbody[turn_count].append(magic_tuple)
-
-        elif bit[1:3] == '01':
-            if bit[3:5] == '00':
-                runit[turn_count] = magic_tuple
-            elif bit[3:5] == '01':
-                bunit[turn_count] = magic_tuple
-            elif bit[3:5] == '10':
-                gunit[turn_count] = magic_tuple
-            elif bit[3:5] == '11':
-                punit[turn_count] = magic_tuple
-
-        tile_count += 1
-
-    return {'red': {'terr': rterr, 'body': rbody, 'unit': runit},
-            'blue': {'terr': bterr, 'body': bbody, 'unit': bunit},
-            'green': {'terr': gterr, 'body': gbody, 'unit': gunit},
-            'purple': {'terr': pterr, 'body': pbody, 'unit': punit}}
+        return f.read()
+
+
+def read_dimensions(log_name):
+    # The map width and height are the last two bytes of the log
+    with open(log_name, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < 2:
+            raise ValueError("{0} is too short to be a replay log".format(log_name))
+        f.seek(-2, os.SEEK_END)
+        width, height = f.read(2)
+    return width, height
+
+
+def count_turns(log_name, width, height):
+    # Number of turns in the log, raises ValueError when it cannot be a whole number of turns
+    frame_size = width * height
+    size = os.path.getsize(log_name) - 2
+    if frame_size == 0 or size < 0 or size % frame_size:
+        raise ValueError("{0} is not a {1}x{2} replay log".format(log_name, width, height))
+    return size // frame_size
+
+
+def iter_frames(log_name, turns_per_chunk=TURNS_PER_CHUNK):
+    # Yields the tiles of every turn as a memoryview, reading the log a chunk of turns at a time
+    width, height = read_dimensions(log_name)
+    frame_size = width * height
+    turn_count = count_turns(log_name, width, height)
+    with open(log_name, 'rb') as f:
+        turn = 0
+        while turn < turn_count:
+            turns = min(turns_per_chunk, turn_count - turn)
+            chunk = memoryview(f.read(turns * frame_size))
+            if len(chunk) < turns * frame_size:
+                raise EOFError("Log ended in the middle of turn {0}".format(turn + len(chunk) // frame_size))
+            for offset in range(0, len(chunk), frame_size):
+                yield chunk[offset:offset + frame_size]
+            turn += turns
+
+
+def find_all(plane, value):
+    indices = []
+    index = plane.find(value)
+    while index >= 0:
+        indices.append(index)
+        index = plane.find(value, index + 1)
+    return indices
+
+
+def decode_planes(frame):
+    # Returns the owner, body and unit planes of one turn
+    tiles = bytes(frame)
+    return tiles.translate(OWNER_TABLE), tiles.translate(BODY_TABLE), tiles.translate(UNIT_TABLE)
+
+
+def find_unit_indices(units):
+    # Tile index of the unit of every team, -1 when it is not on the map
+    return [units.rfind(bytes([index + 1])) for index in range(len(TEAMS))]
+
+
+def find_units(units, coordinates):
+    # Position of the unit of every team, (-1, -1) when it is not on the map
+    return [coordinates[unit] if unit >= 0 else (-1, -1) for unit in find_unit_indices(units)]
+
+
+def find_deaths(previous_bodies, previous_units, units, coordinates):
+    # Returns (victim, killer) team indices for every unit that died between two turns, killer being -1 when unknown.
+    # A unit only ever moves one tile per turn, so a unit that disappears or jumps further has died (and respawned).
+    # The killer is the team whose head landed on the victim's trail or head.
+    deaths = []
+    for victim, (before, after) in enumerate(zip(previous_units, units)):
+        if before < 0:
+            continue
+        if after >= 0:
+            (x1, y1), (x2, y2) = coordinates[before], coordinates[after]
+            if abs(x1 - x2) + abs(y1 - y2) <= 1:
+                continue
+        killer = -1
+        for team, head in enumerate(units):
+            if team != victim and head >= 0 and (previous_bodies[head] == victim + 1 or head == before):
+                killer = team
+                break
+        deaths.append((victim, killer))
+    return deaths
+
+
+def decode_turn(owners, bodies, unit_positions, coordinates):
+    # Returns {team: {'terr': [...], 'body': [...], 'unit': (x, y)}} for one turn
+    decoded = {}
+    for index, team in enumerate(TEAMS):
+        code = bytes([index + 1])
+        decoded[team] = {'terr': [coordinates[i] for i in find_all(owners, code)],
+                         'body': [coordinates[i] for i in find_all(bodies, code)],
+                         'unit': unit_positions[index]}
+    return decoded
+
+
+def decode_frame(frame, coordinates):
+    owners, bodies, units = decode_planes(frame)
+    return decode_turn(owners, bodies, find_units(units, coordinates), coordinates)
+
+
+def get_coordinates(width, height):
+    # Point of every tile index of a turn, as laid out in the log
+    return [(i // width, i - width * (i // width)) for i in range(width * height)]
+
+
+def parse_frames(frames, width, height):
+    coordinates = get_coordinates(width, height)
+    parsed = {team: {'terr': {}, 'body': {}, 'unit': {}} for team in TEAMS}
+    for turn_count, frame in enumerate(frames):
+        decoded = decode_frame(frame, coordinates)
+        for team in TEAMS:
+            for key in ('terr', 'body', 'unit'):
+                parsed[team][key][turn_count] = decoded[team][key]
+    return parsed
+
+
+def parse(data):
+    data = memoryview(data)
+    width, height = data[-2], data[-1]
+    frame_size = width * height
+    frames = (data[offset:offset + frame_size] for offset in range(0, len(data) - 2 - frame_size + 1, frame_size))
+    return parse_frames(frames, width, height)
+
+
+def parse_log(log_name):
+    width, height = read_dimensions(log_name)
+    return parse_frames(iter_frames(log_name), width, height)
 
 
 def bin_to_json(log_directory, target_directory):
      with open(target_directory, 'w') as f:
-         f.write(json.dumps(parse(read_binary(log_directory))))
+         f.write(json.dumps(parse_log(log_directory)))
+
+
+def bin_to_columns(log_directory, target_directory):
+    # Writes the columnar replay file described at the top of this module
+    width, height = read_dimensions(log_directory)
+    frame_size = width * height
+    turn_count = count_turns(log_directory, width, height)
+    coordinates = get_coordinates(width, height)
+
+    owners_offset = COLUMNS_HEADER.size
+    bodies_offset = owners_offset + turn_count * frame_size
+    units_offset = bodies_offset + turn_count * frame_size
+    unit_size = len(TEAMS) * 2
+
+    with open(target_directory, 'wb') as f:
+        f.write(COLUMNS_HEADER.pack(COLUMNS_MAGIC, COLUMNS_VERSION, width, height, len(TEAMS), turn_count))
+        f.truncate(units_offset + turn_count * unit_size)
+        for turn, frame in enumerate(iter_frames(log_directory)):
+            owners, bodies, units = decode_planes(frame)
+            positions = bytearray()
+            for x, y in find_units(units, coordinates):
+                positions += bytes((NO_UNIT, NO_UNIT)) if x < 0 else bytes((x, y))
+            f.seek(owners_offset + turn * frame_size)
+            f.write(owners)
+            f.seek(bodies_offset + turn * frame_size)
+            f.write(bodies)
+            f.seek(units_offset + turn * unit_size)
+            f.write(positions)
+
+
+class ColumnarReplay:
+    # Memory-mapped reader of a file written by bin_to_columns, turns are only decoded when asked for
+
+    def __init__(self, file_name):
+        with open(file_name, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.height, team_count, self.turn_count = COLUMNS_HEADER.unpack_from(self._map)
+        if magic != COLUMNS_MAGIC or version != COLUMNS_VERSION or team_count != len(TEAMS):
+            self._map.close()
+            raise ValueError("{0} is not a version {1} columnar replay".format(file_name, COLUMNS_VERSION))
+
+        self.frame_size = self.width * self.height
+        self.coordinates = get_coordinates(self.width, self.height)
+        self._data = memoryview(self._map)
+        data = self._data
+        owners_offset = COLUMNS_HEADER.size
+        bodies_offset = owners_offset + self.turn_count * self.frame_size
+        units_offset = bodies_offset + self.turn_count * self.frame_size
+        self.owners = data[owners_offset:bodies_offset]
+        self.bodies = data[bodies_offset:units_offset]
+        self.units = data[units_offset:units_offset + self.turn_count * len(TEAMS) * 2]
+
+    def get_owner_planes(self, start, stop):
+        # Owner planes of turns [start, stop) as one memoryview, frame_size bytes per turn.
+        # Views still held when the replay is closed keep the file mapped until they are released
+        return self.owners[start * self.frame_size:stop * self.frame_size]
+
+    def get_body_planes(self, start, stop):
+        return self.bodies[start * self.frame_size:stop * self.frame_size]
+
+    def get_unit_positions(self, turn):
+        # Position of the unit of every team on a turn, in TEAMS order
+        positions = self.units[turn * len(TEAMS) * 2:(turn + 1) * len(TEAMS) * 2]
+        return [(-1, -1) if positions[i] == NO_UNIT else (positions[i], positions[i + 1])
+                for i in range(0, len(positions), 2)]
+
+    def decode_turn(self, turn):
+        # Same per-team layout as one turn of parse
+        return decode_turn(bytes(self.get_owner_planes(turn, turn + 1)), bytes(self.get_body_planes(turn, turn + 1)),
+                           self.get_unit_positions(turn), self.coordinates)
+
+    def decode_turns(self, start, stop):
+        # Same layout as parse, restricted to turns [start, stop)
+        parsed = {team: {'terr': {}, 'body': {}, 'unit': {}} for team in TEAMS}
+        for turn in range(max(start, 0), min(stop, self.turn_count)):
+            decoded = self.decode_turn(turn)
+            for team in TEAMS:
+                for key in ('terr', 'body', 'unit'):
+                    parsed[team][key][turn] = decoded[team][key]
+        return parsed
+
+    def close(self):
+        self.owners.release()
+        self.bodies.release()
+        self.units.release()
+        self._data.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # Views from get_owner_planes or get_body_planes are still held, the map is closed with the last of them
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
 
 if __name__ == "__main__":
-    bin_to_json(sys.argv[1], sys.argv[2])
+    args = sys.argv[1:]
+    convert = bin_to_json
+    if args and args[0] == '--columns':
+        convert = bin_to_columns
+        args = args[1:]
     try:
-        bin_to_json(sys.argv[1], sys.argv[2])
+        convert(args[0], args[1])
     except:
-        if len(sys.argv) != 3:
-            print('Invalid args: format = python parse_log.py log_directory target_directory')
+        if len(args) != 2:
+            print('Invalid args: format = python parse_log.py [--columns] log_directory target_directory')
         else:
             print('Invalid file name: check your file names')
@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import glob
+
+from parse_log import TEAMS, read_dimensions, get_coordinates, iter_frames, decode_planes, find_unit_indices, \
+    find_deaths
+
+INDEX_VERSION = 1
+INDEX_EXTENSION = '.index.json'
+
+
+def build_index(log_name):
+    # Per-turn territory, trail length and head of every team, and the turns of every death and capture,
+    # gathered in one pass over the log
+    width, height = read_dimensions(log_name)
+    coordinates = get_coordinates(width, height)
+    teams = {team: {'territory': [], 'body': [], 'head': [], 'deaths': [], 'kills': [], 'captures': []}
+             for team in TEAMS}
+    deaths = []
+    previous_bodies = previous_units = None
+
+    for turn, frame in enumerate(iter_frames(log_name)):
+        owners, bodies, units = decode_planes(frame)
+        units = find_unit_indices(units)
+        for index, team in enumerate(TEAMS):
+            stats = teams[team]
+            territory = owners.count(index + 1)
+            if stats['territory'] and territory > stats['territory'][-1]:
+                stats['captures'].append([turn, territory - stats['territory'][-1]])
+            stats['territory'].append(territory)
+            stats['body'].append(bodies.count(index + 1))
+            stats['head'].append(list(coordinates[units[index]]) if units[index] >= 0 else [-1, -1])
+        if previous_units is not None:
+            for victim, killer in find_deaths(previous_bodies, previous_units, units, coordinates):
+                teams[TEAMS[victim]]['deaths'].append(turn)
+                if killer >= 0:
+                    teams[TEAMS[killer]]['kills'].append(turn)
+                deaths.append([turn, TEAMS[victim], TEAMS[killer] if killer >= 0 else None])
+        previous_bodies, previous_units = bodies, units
+
+    return {'version': INDEX_VERSION,
+            'log': log_name,
+            'width': width,
+            'height': height,
+            'turns': len(teams[TEAMS[0]]['territory']),
+            'teams': teams,
+            'deaths': deaths}
+
+
+def get_index_name(output_name):
+    # Index stored next to a parsed output (or log) of the same name
+    return os.path.splitext(output_name)[0] + INDEX_EXTENSION
+
+
+def write_index(index, index_name):
+    with open(index_name, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+
+class ReplayIndex:
+    # Query helpers over an index written by write_index, answered without touching the log
+
+    def __init__(self, index):
+        if index.get('version') != INDEX_VERSION:
+            raise ValueError("Unsupported replay index version: {0}".format(index.get('version')))
+        self.index = index
+        self.log = index['log']
+        self.turns = index['turns']
+        self.teams = index['teams']
+
+    @classmethod
+    def load(cls, index_name):
+        with open(index_name) as f:
+            return cls(json.load(f))
+
+    def get_territory_curve(self, team):
+        return self.teams[team]['territory']
+
+    def get_body_lengths(self, team):
+        return self.teams[team]['body']
+
+    def get_head(self, team, turn):
+        # (x, y) of the unit of a team on a turn, (-1, -1) when it is not on the map
+        return tuple(self.teams[team]['head'][turn])
+
+    def get_death_turns(self, team):
+        return self.teams[team]['deaths']
+
+    def get_kill_turns(self, team):
+        return self.teams[team]['kills']
+
+    def get_trail_cut_turns(self, team):
+        # Turns on which another team's unit killed the unit of a team
+        return [turn for turn, victim, killer in self.index['deaths'] if victim == team and killer is not None]
+
+    def get_capture_turns(self, team):
+        return [turn for turn, gained in self.teams[team]['captures']]
+
+    def get_captures(self, team):
+        # (turn, tiles gained) of every turn on which the territory of a team grew
+        return [tuple(capture) for capture in self.teams[team]['captures']]
+
+    def get_final_territory(self):
+        return {team: stats['territory'][-1] if stats['territory'] else 0 for team, stats in self.teams.items()}
+
+    def get_winners(self):
+        # Teams holding the most territory at the end of the game, empty when nobody holds any
+        territory = self.get_final_territory()
+        most = max(territory.values())
+        return [team for team in TEAMS if most > 0 and territory[team] == most]
+
+
+def load_indices(patterns):
+    # ReplayIndex of every index file matched by the patterns (files, directories or globs)
+    indices = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*' + INDEX_EXTENSION)
+        for index_name in sorted(glob.glob(pattern)):
+            indices.append(ReplayIndex.load(index_name))
+    return indices
+
+
+if __name__ == "__main__":
+    try:
+        log_name = sys.argv[1]
+        index_name = sys.argv[2] if len(sys.argv) > 2 else get_index_name(log_name)
+        write_index(build_index(log_name), index_name)
+    except:
+        if len(sys.argv) not in (2, 3):
+            print('Invalid args: format = python replay_index.py log_directory [index_directory]')
+        else:
+            print('Invalid file name: check your file names')
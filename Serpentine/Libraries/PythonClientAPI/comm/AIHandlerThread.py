@@ -17,6 +17,7 @@ class AIHandlerThread(threading.Thread):
     def __init__(self, group=None, target=None, name = None, args=(), kwargs={}, daemon=None):
         threading.Thread.__init__(self, group=group, target=target, daemon=daemon, args=args, kwargs=kwargs)
         self.player_move = Signals.NO_RESPONSE.name
+        self.do_move_time = None
 
     def run(self):
         player_ai = self._kwargs['player_ai']
@@ -34,6 +35,7 @@ class AIHandlerThread(threading.Thread):
 
             self.player_move = MoveRequest({friendly_unit.uuid: friendly_unit})
             end_time = time.time()
+            self.do_move_time = end_time - start_time
             print("[TIME] " + str(round((end_time - start_time) * 1000)) + " ms")
 
             player_move_event.set()
@@ -0,0 +1,339 @@
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import traceback
+
+import PythonClientAPI.game.JSON as JSON
+import PythonClientAPI.config.Constants as constants
+from PythonClientAPI.comm.Signals import Signals
+from PythonClientAPI.comm.TurnBudget import TurnBudget
+from PythonClientAPI.game.Enums import Status
+from PythonClientAPI.game.GameState import MoveRequest
+from PythonClientAPI.game.MapLayout import MapLayout
+from PythonClientAPI.navigation.NavigationCache import load_navigation_cache
+
+THREAD = 'thread'
+PROCESS = 'process'
+WORKER_MODES = (THREAD, PROCESS)
+
+# Requests sent to the worker, and echoed in its replies
+SET_UP = 'set_up'
+TURN = 'turn'
+STOP = 'stop'
+
+# Constants the worker process needs and does not get from the client when spawned
+WORKER_SETTINGS = ('LOCAL_PLAYER_UUID', 'MAP_NAME', 'MAPS_DIRECTORY')
+
+
+def predict_game_state(dct, local_uuid, next_point, world):
+    """
+    Returns the game state expected after the current turn if the friendly unit moves to next_point and the enemies
+    stay in place. A move closing the friendly unit's loop captures what it encloses; collisions and kills are not
+    predicted.
+
+    :param dct: game state of the current turn, as sent by the server.
+    :param local_uuid: uuid of the friendly unit.
+    :param next_point: point the friendly unit moves to.
+    :param World world: world of the current turn.
+    :return: predicted game state, or None if the move is not one the server would play as is.
+    :rtype: dict
+    """
+    unit = world.friendly_unit
+    if unit.status == Status.DISABLED.name or next_point is None or next_point in unit.body or \
+            next_point not in world.get_open_neighbours(unit.position).values():
+        return None
+
+    players = dct['playerUUIDToPlayerTypeMap']
+    player = players[local_uuid]
+    trace = list(player['playerTrace'])
+    if unit.position not in unit.territory:
+        trace.append(JSON.tuple_to_point(unit.position))
+    predicted_players = dict(players)
+    predicted_unit = dict(player['playerUnit'], position=JSON.tuple_to_point(next_point))
+    predicted_players[local_uuid] = dict(player, playerUnit=predicted_unit, playerStatus=Status.VALID_MOVE.name,
+                                         playerTrace=trace)
+
+    if next_point in unit.territory and unit.body:
+        filled = world.fill.flood_fill(unit.body, unit.territory, unit.position, next_point)
+        captured = filled - unit.territory
+        predicted_players[local_uuid].update(playerTrace=[],
+                                             playerTerritory=[JSON.tuple_to_point(point) for point in filled])
+        for uuid, other in players.items():
+            if uuid != local_uuid:
+                predicted_players[uuid] = dict(
+                    other,
+                    playerTrace=[point for point in other['playerTrace'] if (point['x'], point['y']) not in captured],
+                    playerTerritory=[point for point in other['playerTerritory']
+                                     if (point['x'], point['y']) not in captured])
+    return dict(dct, playerUUIDToPlayerTypeMap=predicted_players)
+
+
+class PonderBudget(TurnBudget):
+    """
+    Budget of pondering in an AIWorker, cancelled as soon as the worker's next request (normally the next turn)
+    arrives.
+    """
+    def __init__(self, connection, max_response_time):
+        """
+        :param connection: worker end of the AIWorker's pipe.
+        :param max_response_time: response time (in ms) allowed by the server, the longest the server can take
+                                  to play a turn.
+        """
+        super().__init__(time.monotonic(), max_response_time)
+        self.connection = connection
+
+    def should_stop(self, reserve=0):
+        if not self.cancelled and self.connection.poll():
+            self.cancel()
+        return super().should_stop(reserve)
+
+
+class TurnRunner:
+    """
+    Plays the bot's turns from the server's messages: decodes the game state into the world of the previous turn,
+    calls do_move and encodes the move. It lives as long as the worker, so the world, the PlayerAI and their caches
+    stay warm from one turn to the next.
+    """
+    def __init__(self, player_ai, local_uuid=None):
+        """
+        :param player_ai: PlayerAI playing the turns.
+        :param local_uuid: uuid of the client, defaults to LOCAL_PLAYER_UUID.
+        """
+        self.player_ai = player_ai
+        self.local_uuid = local_uuid
+        self.tiles = []
+        self.map_layout = None
+        self.world = None
+        self.state = None
+        self.friendly_unit = None
+        # Seconds spent in every phase of the last turn (see TimingRecorder.PHASES)
+        self.phase_times = {}
+
+    def set_up(self, tiles_message):
+        """
+        Reads the tiles of a new game and starts loading its navigation cache.
+
+        :param tiles_message: message the server sends after GET_READY.
+        :return: void
+        """
+        self.tiles = JSON.parse_tile_data(tiles_message)
+        self.map_layout = MapLayout(self.tiles)
+        self.world = None
+        self.state = None
+        load_navigation_cache(self.tiles)
+
+    def run_turn(self, state_message, budget=None):
+        """
+        Plays one turn.
+
+        :param state_message: game state the server sends after MOVE.
+        :param TurnBudget budget: time left to answer, given to the bot as world.budget.
+        :return: move to send back, as JSON, or NO_RESPONSE if the turn could not be played.
+        :rtype: str
+        """
+        self.phase_times = phase_times = {}
+        try:
+            start_time = time.perf_counter()
+            self.state = json.loads(state_message)
+            phase_times['decode'] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            friendly_unit, enemy_units = self.update_world(self.state, budget)
+            phase_times['world'] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            self.player_ai.do_move(self.world, friendly_unit, enemy_units)
+            phase_times['do_move'] = time.perf_counter() - start_time
+            print("[TIME] " + str(round(phase_times['do_move'] * 1000)) + " ms")
+
+            start_time = time.perf_counter()
+            client_move_json = json.dumps(MoveRequest({friendly_unit.uuid: friendly_unit}), cls=JSON.SPPEncoder)
+            phase_times['encode'] = time.perf_counter() - start_time
+            return client_move_json
+        except:
+            print("An exception occurred in calling do_move: \n", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+            self.state = None
+            return Signals.NO_RESPONSE.name
+
+    def ponder(self, budget):
+        """
+        Lets the bot think ahead while the server plays the turn, by calling its optional
+        ponder(world, friendly_unit, enemy_units) on the state predicted by predict_game_state.
+
+        The world is moved to the predicted state, so the next turn only patches what the prediction got wrong:
+        world.changed_points then holds those points alone, and distance fields computed while pondering are
+        kept unless their sources changed. Whatever else the bot keeps from pondering is up to it.
+        Pondering should return once budget.should_stop() is True, the next turn waits for it.
+
+        :param TurnBudget budget: budget cancelled when the real state arrives, given to the bot as world.budget.
+        :return: void
+        """
+        ponder = getattr(self.player_ai, 'ponder', None)
+        if ponder is None or self.state is None:
+            return
+        try:
+            next_point = self.friendly_unit.next_move_target
+            predicted_state = predict_game_state(self.state, self.get_local_uuid(), next_point, self.world)
+            if predicted_state is None:
+                return
+            friendly_unit, enemy_units = self.update_world(predicted_state, budget)
+            self.state = None
+            ponder(self.world, friendly_unit, enemy_units)
+        except:
+            print("An exception occurred in calling ponder: \n", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+
+    def update_world(self, state, budget):
+        local_uuid = self.get_local_uuid()
+        decoded_game_data = JSON.as_game_state(state, self.tiles, self.world, self.map_layout, local_uuid)
+        self.world = decoded_game_data.world
+        self.world.budget = budget
+        self.friendly_unit = decoded_game_data.player_uuid_to_player_type_map[local_uuid].friendly_unit
+        enemy_units = [decoded_game_data.player_uuid_to_player_type_map[uuid].friendly_unit
+                       for uuid in decoded_game_data.enemy_uuids]
+        return self.friendly_unit, enemy_units
+
+    def get_local_uuid(self):
+        return self.local_uuid if self.local_uuid is not None else constants.LOCAL_PLAYER_UUID
+
+
+def serve_turns(connection, turn_runner, ponder=False):
+    """
+    Answers an AIWorker's requests until it is stopped, or until it closes its end of the pipe
+    (e.g. at the end of the game while the last turn is still being played).
+
+    :param connection: worker end of the AIWorker's pipe.
+    :param turn_runner: TurnRunner playing the turns.
+    :param ponder: whether to ponder (see TurnRunner.ponder) after every turn, until the next request arrives.
+    :return: void
+    """
+    try:
+        while True:
+            request = connection.recv()
+            # Turns that queued up while the bot was over time are stale, only the latest one is played
+            while request[0] == TURN and connection.poll():
+                request = connection.recv()
+            if request[0] == STOP:
+                break
+            elif request[0] == SET_UP:
+                turn_runner.set_up(request[1])
+                connection.send((SET_UP, None))
+            else:
+                budget = request[2]
+                client_move_json = turn_runner.run_turn(request[3], budget)
+                connection.send((TURN, request[1], client_move_json, turn_runner.phase_times))
+                if ponder:
+                    turn_runner.ponder(PonderBudget(connection, budget.max_response_time))
+    except (OSError, EOFError):
+        pass
+    connection.close()
+
+
+def run_worker_process(connection, player_ai, settings, ponder):
+    for name, value in settings.items():
+        setattr(constants, name, value)
+    serve_turns(connection, TurnRunner(player_ai), ponder)
+
+
+class AIWorker:
+    """
+    Long-lived worker playing the bot's turns, taking them over a pipe.
+
+    In THREAD mode the worker is a thread of the client, which saves starting a thread every turn. In PROCESS mode
+    it is a separate process holding its own copy of the PlayerAI, so the bot's computations and garbage
+    collections no longer hold the GIL while the client times the response and talks to the server.
+    Either way, the game state is decoded in the worker, so only the server's messages go through the pipe.
+
+    With pondering on, the worker keeps computing on the predicted next state while the server plays the turn
+    (see TurnRunner.ponder).
+    """
+    def __init__(self, player_ai, mode=THREAD, ponder=False):
+        """
+        :param player_ai: PlayerAI playing the turns, copied into the worker process in PROCESS mode.
+        :param mode: THREAD or PROCESS.
+        :param ponder: whether to let the bot ponder between turns, if it has a ponder method.
+        """
+        if mode not in WORKER_MODES:
+            raise ValueError("Unknown AI worker mode {0}, expected one of {1}".format(mode, ", ".join(WORKER_MODES)))
+        self.player_ai = player_ai
+        self.mode = mode
+        self.ponder = ponder
+        self.connection = None
+        self.worker = None
+
+    def start(self):
+        """
+        Starts the worker. Constants the worker needs (see WORKER_SETTINGS) are read now.
+
+        :return: void
+        """
+        self.connection, worker_connection = multiprocessing.Pipe()
+        if self.mode == THREAD:
+            self.worker = threading.Thread(target=serve_turns,
+                                           args=(worker_connection, TurnRunner(self.player_ai), self.ponder),
+                                           daemon=True)
+        else:
+            settings = {name: getattr(constants, name) for name in WORKER_SETTINGS}
+            self.worker = multiprocessing.Process(target=run_worker_process,
+                                                  args=(worker_connection, self.player_ai, settings, self.ponder),
+                                                  daemon=True)
+        self.worker.start()
+
+    def set_up(self, tiles_message):
+        """
+        Sets the worker up for a new game, and waits until it is done.
+
+        :param tiles_message: message the server sends after GET_READY.
+        :return: void
+        """
+        self.connection.send((SET_UP, tiles_message))
+        while self.connection.recv()[0] != SET_UP:
+            pass
+
+    def submit_turn(self, turn, budget, state_message):
+        """
+        Hands a turn to the worker, which plays it once it is done with the previous ones.
+
+        :param turn: number of the turn, to match the move to it.
+        :param TurnBudget budget: time left to answer. The monotonic clock is shared with the worker process.
+        :param state_message: game state the server sends after MOVE.
+        :return: void
+        """
+        self.connection.send((TURN, turn, budget, state_message))
+
+    def get_move(self, turn, end_time):
+        """
+        Waits for the move of a turn. Moves of earlier turns that arrive in the meantime are dropped.
+
+        :param turn: number of the turn.
+        :param end_time: time (as given by time.monotonic) after which to stop waiting.
+        :return: move as JSON and seconds the worker spent in every phase of the turn (see TurnRunner.phase_times),
+                 or None if the move did not arrive in time.
+        :rtype: tuple
+        """
+        try:
+            while self.connection.poll(max(0, end_time - time.monotonic())):
+                response = self.connection.recv()
+                if response[0] == TURN and response[1] == turn:
+                    return response[2], response[3]
+        except EOFError:
+            print("The AI worker stopped", file=sys.stderr)
+        return None
+
+    def stop(self):
+        """
+        Stops the worker once it is done with its current turn, without waiting for it: the move of that turn is
+        dropped.
+
+        :return: void
+        """
+        if self.worker is not None:
+            try:
+                self.connection.send((STOP,))
+            except OSError:
+                pass
+            self.connection.close()
+            self.worker = None
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import PythonClientAPI.comm.CommunicationConstants as cc
+from PythonClientAPI.comm.AIWorker import TurnRunner
+from PythonClientAPI.comm.ClientChannelHandler import HEADER_SIZE, STRING_ENCODING
+from PythonClientAPI.comm.Signals import Signals
+from PythonClientAPI.comm.TurnBudget import TurnBudget
+
+
+class AsyncClientHandlerProtocol:
+    """
+    asyncio version of ClientHandlerProtocol, exchanging the same messages with the server: GET_READY and the tiles,
+    READY, BEGIN and the uuid, then MOVE and the game state every turn, answered by the move or NO_RESPONSE,
+    and finally END.
+
+    Turns are played by a TurnRunner on the client's own single-thread executor, and the response time is enforced
+    by asyncio.wait_for rather than by polling. A turn that runs out of time keeps the executor until do_move returns;
+    later turns queue behind it, and those still queued when their own time runs out are dropped.
+
+    The port, response time and uuid are kept per client rather than in CommunicationConstants and Constants,
+    so one event loop can run several clients, e.g. ``asyncio.gather(*(client.run() for client in clients))``.
+
+    With pondering on, the executor keeps computing on the predicted next state between turns
+    (see TurnRunner.ponder) until the server's next message arrives.
+    """
+    def __init__(self, player_ai, port_number, max_response_time, uuid_string, host_name=None, ponder=False,
+                 timing_recorder=None):
+        """
+        :param player_ai: PlayerAI playing the turns.
+        :param port_number: port of the server.
+        :param max_response_time: response time (in ms) allowed by the server.
+        :param uuid_string: uuid of the client.
+        :param host_name: host name of the server, defaults to HOST_NAME.
+        :param ponder: whether to let the bot ponder between turns, if it has a ponder method.
+        :param timing_recorder: TimingRecorder of the phases of every turn, None not to record them.
+        """
+        self.client_uuid = uuid_string
+        self.port_number = port_number
+        self.host_name = host_name
+        self.max_response_time = max_response_time
+        self.turn_runner = TurnRunner(player_ai, uuid_string)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.ponder = ponder
+        self.ponder_budget = None
+        self.timing_recorder = timing_recorder
+        self.game_is_ongoing = False
+        self.turn = 0
+        self.reader = None
+        self.writer = None
+
+    def start_communications(self):
+        asyncio.run(self.run())
+
+    async def run(self):
+        """
+        Connects to the server and plays until it sends END.
+
+        :return: void
+        """
+        await self.start_connection()
+        self.game_is_ongoing = True
+        try:
+            while self.game_is_ongoing:
+                message_from_server = await self.receive_message()
+                if self.ponder_budget is not None:
+                    self.ponder_budget.cancel()
+                    self.ponder_budget = None
+                await self.relay_message_and_respond_to(message_from_server)
+        finally:
+            if self.game_is_ongoing:
+                await self.end_communications()
+            self.executor.shutdown(wait=False)
+
+    async def start_connection(self):
+        host_name = self.host_name if self.host_name is not None else cc.HOST_NAME
+        self.reader, self.writer = await asyncio.open_connection(host_name, self.port_number)
+        print("Connected to Server")
+
+    async def end_communications(self):
+        self.game_is_ongoing = False
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        print("Closing Comms (Python Client)")
+        if self.timing_recorder is not None:
+            self.timing_recorder.close()
+            print(self.timing_recorder.format_summary())
+
+    async def relay_message_and_respond_to(self, message_from_server):
+        if message_from_server == Signals.BEGIN.name:
+            await self.send_message(self.client_uuid)
+        elif message_from_server == Signals.MOVE.name:
+            await self.next_move_from_client()
+        elif message_from_server == Signals.END.name:
+            await self.end_communications()
+        elif message_from_server == Signals.GET_READY.name:
+            game_initial_state = await self.receive_message_bytes()
+            await asyncio.get_running_loop().run_in_executor(self.executor, self.turn_runner.set_up,
+                                                             game_initial_state)
+            await self.send_message(Signals.READY.name)
+        else:
+            await self.end_communications()
+            raise Exception("Unrecognized signal received from server {0}".format(message_from_server))
+
+    async def next_move_from_client(self):
+        # The server's clock runs from when it sent MOVE, so the budget includes receiving and decoding the state
+        budget = TurnBudget(time.monotonic(), self.max_response_time)
+        start_time = time.perf_counter()
+        game_data_from_server = await self.receive_message_bytes()
+        phase_times = {'receive': time.perf_counter() - start_time}
+        self.turn += 1
+        turn = asyncio.get_running_loop().run_in_executor(self.executor, self.turn_runner.run_turn,
+                                                          game_data_from_server, budget)
+        try:
+            client_move_json = await asyncio.wait_for(turn, budget.end_time - time.monotonic())
+            phase_times.update(self.turn_runner.phase_times)
+        except asyncio.TimeoutError:
+            print("The AI timed out with a maximum allowed response time of: {0} ms".format(self.max_response_time))
+            print("time ", budget.elapsed() * 1000)
+            print("turn ", self.turn)
+            client_move_json = Signals.NO_RESPONSE.name
+        send_start_time = time.perf_counter()
+        await self.send_message(client_move_json)
+        if self.timing_recorder is not None:
+            end_time = time.perf_counter()
+            phase_times['send'] = end_time - send_start_time
+            self.timing_recorder.record(self.turn, phase_times, end_time - start_time, budget.is_expired())
+        if self.ponder:
+            self.ponder_budget = TurnBudget(time.monotonic(), self.max_response_time)
+            asyncio.get_running_loop().run_in_executor(self.executor, self.turn_runner.ponder, self.ponder_budget)
+
+    async def send_message(self, message):
+        byte_encoded_message = message.encode(STRING_ENCODING)
+        self.writer.write(len(byte_encoded_message).to_bytes(HEADER_SIZE, 'big') + byte_encoded_message)
+        await self.writer.drain()
+
+    async def receive_message_bytes(self):
+        size = int.from_bytes(await self.reader.readexactly(HEADER_SIZE), byteorder='big')
+        return await self.reader.readexactly(size)
+
+    async def receive_message(self):
+        message = ''
+        while message == '':
+            message = (await self.receive_message_bytes()).decode(STRING_ENCODING).strip()
+        return message
@@ -3,17 +3,24 @@ import socket
 END_OF_MESSAGE_DELIMITER = '\n'
 MAX_BYTES_TO_RECEIVE = 1
 STRING_ENCODING = 'utf-8'
+HEADER_SIZE = 4
+INITIAL_BUFFER_SIZE = 1 << 16
 
 
 class ClientChannelHandler():
 
     def __init__(self):
         self.connected = False
+        # Bytes received but not consumed yet are kept in buffer[buffer_start:buffer_end] across messages
+        self.buffer = bytearray(INITIAL_BUFFER_SIZE)
+        self.buffer_start = 0
+        self.buffer_end = 0
 
     def start_socket_connection(self, port_number, host_name):
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.connect((host_name, port_number))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.connected = True
             print("Connected to Server")
         except socket.error:
@@ -30,29 +37,59 @@ class ClientChannelHandler():
         try:
             byte_encoded_message = message.encode(STRING_ENCODING)
             size = len(byte_encoded_message)
-            size_bytes = size.to_bytes(4, 'big')
-            self.sock.sendall(size_bytes)
-            self.sock.sendall(byte_encoded_message)
+            # Header and body go out in one system call (and one segment for small messages)
+            self.sock.sendall(size.to_bytes(HEADER_SIZE, 'big') + byte_encoded_message)
         except socket.error:
             self.close_connection()
             raise Exception("Socket failed to send. Closing socket")
 
     def receive_message(self):
+        return self.receive_message_bytes().decode(STRING_ENCODING).strip()
+
+    def receive_message_bytes(self):
+        """
+        Returns the next message as undecoded bytes, which json.loads reads directly.
+
+        :rtype: bytes
+        """
         self.check_socket_connection()
-        size_bytes = self.buffered_recv(4)
-        size = int.from_bytes(size_bytes, byteorder='big')
-        message_bytes = self.buffered_recv(size)
-        received_data = message_bytes.decode(STRING_ENCODING)
-        return received_data.strip()
+        size = int.from_bytes(self.buffered_recv(HEADER_SIZE), byteorder='big')
+        return bytes(self.buffered_recv(size))
 
     def buffered_recv(self, size):
-        bytes_read = 0
-        msg_chunks = []
-        while bytes_read < size:
-            new_bytes = self.sock.recv(size - bytes_read)
-            bytes_read += len(new_bytes)
-            msg_chunks.append(new_bytes)
-        return b"".join(msg_chunks)
+        """
+        Returns a view of the next size bytes received, valid until the next call.
+        The socket is read into the persistent buffer as far as it has data, so a message arriving in the
+        same segments as the previous one costs no extra system call.
+
+        :param size: number of bytes to consume.
+        :rtype: memoryview
+        """
+        if self.buffer_end - self.buffer_start < size:
+            self.fill_buffer(size)
+        start = self.buffer_start
+        self.buffer_start += size
+        return memoryview(self.buffer)[start:start + size]
+
+    def fill_buffer(self, size):
+        # Moves the unconsumed bytes to the front of the buffer (growing it if needed), then reads until size are there
+        pending = self.buffer_end - self.buffer_start
+        if len(self.buffer) < size:
+            buffer = bytearray(max(size, 2 * len(self.buffer)))
+            buffer[:pending] = self.buffer[self.buffer_start:self.buffer_end]
+            self.buffer = buffer
+        elif self.buffer_start:
+            self.buffer[:pending] = self.buffer[self.buffer_start:self.buffer_end]
+        self.buffer_start = 0
+        self.buffer_end = pending
+
+        with memoryview(self.buffer) as view:
+            while self.buffer_end < size:
+                bytes_read = self.sock.recv_into(view[self.buffer_end:])
+                if bytes_read == 0:
+                    self.close_connection()
+                    raise Exception("Socket closed by the server")
+                self.buffer_end += bytes_read
 
     def check_socket_connection(self):
         if not self.connected:
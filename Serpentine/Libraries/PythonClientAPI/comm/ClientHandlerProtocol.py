@@ -3,13 +3,20 @@ from PythonClientAPI.comm.ClientChannelHandler import *
 import PythonClientAPI.game.JSON as JSON
 import PythonClientAPI.comm.CommunicationConstants as cc
 from PythonClientAPI.comm.AIHandlerThread import *
+from PythonClientAPI.comm.TurnBudget import TurnBudget
 from PythonClientAPI.game.Enums import Direction
+from PythonClientAPI.game.MapLayout import MapLayout
+from PythonClientAPI.navigation.NavigationCache import load_navigation_cache
 from PythonClientAPI.comm.Signals import Signals
 
 
 class ClientHandlerProtocol:
-    def __init__(self, player_ai, port_number, max_response_time, uuid_string):
+    def __init__(self, player_ai, port_number, max_response_time, uuid_string, ai_worker=None, timing_recorder=None):
         self.player_ai = player_ai
+        # AIWorker playing the turns, None to play each turn in a new AIHandlerThread
+        self.ai_worker = ai_worker
+        # TimingRecorder of the phases of every turn, None not to record them
+        self.timing_recorder = timing_recorder
         self.client_uuid = uuid_string
         self.game_is_ongoing = False
         self.ai_responded = True
@@ -17,6 +24,8 @@ class ClientHandlerProtocol:
         cc.PORT_NUMBER = port_number
         self.turn = 0
         self.tiles = []
+        self.map_layout = None
+        self.world = None
 
     def start_connection(self):
         self.client_channel_handler = ClientChannelHandler()
@@ -41,6 +50,11 @@ class ClientHandlerProtocol:
     def end_communications(self):
         self.client_channel_handler.close_connection()
         self.game_is_ongoing = False
+        if self.ai_worker is not None:
+            self.ai_worker.stop()
+        if self.timing_recorder is not None:
+            self.timing_recorder.close()
+            print(self.timing_recorder.format_summary())
 
     def relay_message_and_respond_to(self, message_from_server):
         if message_from_server == Signals.BEGIN.name:
@@ -50,8 +64,14 @@ class ClientHandlerProtocol:
         elif message_from_server == Signals.END.name:
             self.end_communications()
         elif message_from_server == Signals.GET_READY.name:
-            game_initial_state = self.client_channel_handler.receive_message()
-            self.tiles = JSON.parse_tile_data(game_initial_state)
+            game_initial_state = self.client_channel_handler.receive_message_bytes()
+            if self.ai_worker is not None:
+                self.ai_worker.set_up(game_initial_state)
+            else:
+                self.tiles = JSON.parse_tile_data(game_initial_state)
+                self.map_layout = MapLayout(self.tiles)
+                self.world = None
+                load_navigation_cache(self.tiles)
             self.client_channel_handler.send_message(Signals.READY.name)
         else:
             self.end_communications()
@@ -61,20 +81,47 @@ class ClientHandlerProtocol:
         self.client_channel_handler.send_message(self.client_uuid)
 
     def next_move_from_client(self):
-
-        game_data_from_server = self.client_channel_handler.receive_message()
-        decoded_game_data = JSON.parse_game_state(game_data_from_server, self.tiles)
-
-        client_move = self.get_timed_ai_response(decoded_game_data)
-
-        if isinstance(client_move, str):
-            client_move_json = client_move
+        # The server's clock runs from when it sent MOVE, so the budget includes receiving and decoding the state
+        budget = TurnBudget(time.monotonic(), cc.MAXIMUM_ALLOWED_RESPONSE_TIME)
+        start_time = time.perf_counter()
+        game_data_from_server = self.client_channel_handler.receive_message_bytes()
+        phase_start_time = time.perf_counter()
+        phase_times = {'receive': phase_start_time - start_time}
+        if self.ai_worker is not None:
+            client_move_json = self.get_timed_worker_response(game_data_from_server, budget, phase_times)
         else:
-            client_move_json = json.dumps(client_move, cls=JSON.SPPEncoder)
-
+            # The world is patched in place, so only reuse it once the AI has let go of the previous turn's state
+            previous_world = self.world if self.ai_responded else None
+            # Otherwise the thread of a turn that timed out is still running, and the move it returns is not this turn's
+            starts_new_thread = self.ai_responded
+            game_state_dct = json.loads(game_data_from_server)
+            phase_times['decode'] = time.perf_counter() - phase_start_time
+            phase_start_time = time.perf_counter()
+            decoded_game_data = JSON.as_game_state(game_state_dct, self.tiles, previous_world, self.map_layout)
+            self.world = decoded_game_data.world
+            self.world.budget = budget
+            phase_times['world'] = time.perf_counter() - phase_start_time
+
+            client_move = self.get_timed_ai_response(decoded_game_data, budget)
+
+            if isinstance(client_move, str):
+                client_move_json = client_move
+            else:
+                phase_start_time = time.perf_counter()
+                client_move_json = json.dumps(client_move, cls=JSON.SPPEncoder)
+                # The phases of a late move from an earlier turn are left out rather than recorded under this turn
+                if starts_new_thread:
+                    phase_times['do_move'] = self.ai_handler_thread.do_move_time
+                    phase_times['encode'] = time.perf_counter() - phase_start_time
+
+        phase_start_time = time.perf_counter()
         self.client_channel_handler.send_message(client_move_json)
+        if self.timing_recorder is not None:
+            end_time = time.perf_counter()
+            phase_times['send'] = end_time - phase_start_time
+            self.timing_recorder.record(self.turn, phase_times, end_time - start_time, budget.is_expired())
 
-    def get_timed_ai_response(self, game_data):
+    def get_timed_ai_response(self, game_data, budget):
         if self.ai_responded:
             self.player_move_event = threading.Event()
             self.ai_handler_thread = AIHandlerThread(kwargs={'player_ai': self.player_ai,
@@ -82,21 +129,34 @@ class ClientHandlerProtocol:
                                                              'player_move_event': self.player_move_event})
             self.ai_handler_thread.start()
 
-        start_time = time.time()
-        self.time_response(self.player_move_event, start_time + (cc.MAXIMUM_ALLOWED_RESPONSE_TIME / 1000))
+        self.time_response(self.player_move_event, budget.end_time)
         self.turn += 1
-        if self.player_move_event.is_set() and is_valid_response_time(start_time, time.time()):
+        if self.player_move_event.is_set() and is_valid_response_time(budget.arrival_time, time.monotonic()):
             self.ai_responded = True
             return self.ai_handler_thread.get_move()
         else:
-            print("The AI timed out with a maximum allowed response time of: {0} ms".format(
-                cc.MAXIMUM_ALLOWED_RESPONSE_TIME))
-            print("time ", (time.time() - start_time) * 1000)
-            print("turn ", self.turn)
+            self.report_timeout(budget)
             self.ai_responded = False
 
             return Signals.NO_RESPONSE.name
 
+    def get_timed_worker_response(self, game_data_from_server, budget, phase_times):
+        self.turn += 1
+        self.ai_worker.submit_turn(self.turn, budget, game_data_from_server)
+        response = self.ai_worker.get_move(self.turn, budget.end_time)
+        if response is None:
+            self.report_timeout(budget)
+            return Signals.NO_RESPONSE.name
+        client_move_json, worker_phase_times = response
+        phase_times.update(worker_phase_times)
+        return client_move_json
+
+    def report_timeout(self, budget):
+        print("The AI timed out with a maximum allowed response time of: {0} ms".format(
+            cc.MAXIMUM_ALLOWED_RESPONSE_TIME))
+        print("time ", budget.elapsed() * 1000)
+        print("turn ", self.turn)
+
     def pprofile(self, pr):
         pr.disable()
         s = io.StringIO()
@@ -110,7 +170,7 @@ class ClientHandlerProtocol:
         # --------------------------
         # while not player_move_event.is_set() and is_valid_response_time(start_time, time.time()):
         #     time.sleep(0.01)
-        while not player_move_event.is_set() and time.time() < end_time:
+        while not player_move_event.is_set() and time.monotonic() < end_time:
             player_move_event.wait(0.005)
 
         # --------------------------e
@@ -0,0 +1,88 @@
+import csv
+import json
+
+from PythonClientAPI.structures.Statistics import get_percentile, PERCENTILES
+
+# Phases of a turn in the order they run: receiving the game state, decoding its JSON, updating the world,
+# the bot's do_move, encoding the move and sending it
+PHASES = ('receive', 'decode', 'world', 'do_move', 'encode', 'send')
+
+
+class TimingRecorder:
+    """
+    Records how long every phase of the client's turns takes, writes one line per turn to a JSON lines or CSV file,
+    and summarizes them at the end of the game.
+
+    A turn's total runs from the arrival of MOVE to the end of the sending of the move, which is what the server
+    times. Phases a turn did not finish (e.g. do_move and encode of a turn that timed out) are left out.
+    """
+    def __init__(self, file=None):
+        """
+        :param file: path of the file to write, as CSV if it ends with .csv and as JSON lines otherwise.
+                     None to only keep the timings for the summary.
+        """
+        self.turns = 0
+        self.timeouts = 0
+        self.times = {name: [] for name in PHASES + ('total',)}
+        self.file = None
+        self.csv_writer = None
+        if file is not None:
+            self.file = open(file, 'w', newline='')
+            if file.endswith('.csv'):
+                self.csv_writer = csv.writer(self.file)
+                self.csv_writer.writerow(('turn',) + PHASES + ('total', 'timed_out'))
+
+    def record(self, turn, phase_times, total_time, timed_out):
+        """
+        Records the timings of one turn.
+
+        :param turn: number of the turn.
+        :param phase_times: dictionary of phase (see PHASES) to seconds spent in it.
+        :param total_time: seconds from the arrival of MOVE to the end of the sending of the move.
+        :param timed_out: whether the server no longer took the move by the time it was sent.
+        :return: void
+        """
+        self.turns += 1
+        self.timeouts += 1 if timed_out else 0
+        for phase, phase_time in phase_times.items():
+            self.times[phase].append(phase_time)
+        self.times['total'].append(total_time)
+
+        if self.file is None:
+            return
+        milliseconds = {phase: round(phase_time * 1000, 3) for phase, phase_time in phase_times.items()}
+        if self.csv_writer is not None:
+            self.csv_writer.writerow([turn] + [milliseconds.get(phase, '') for phase in PHASES] +
+                                     [round(total_time * 1000, 3), int(timed_out)])
+        else:
+            self.file.write(json.dumps(dict(milliseconds, turn=turn, total=round(total_time * 1000, 3),
+                                            timed_out=timed_out)) + '\n')
+
+    def get_summary(self):
+        """
+        Returns the number of turns and timeouts, and the percentiles of every phase and of the total.
+
+        :return: dictionary with the turns, the timeouts and the p50/p95/p99/max (in ms) of every phase and the total.
+        :rtype: dict
+        """
+        summary = {'turns': self.turns, 'timeouts': self.timeouts}
+        for name, times in self.times.items():
+            times = sorted(times)
+            summary[name] = {'p{0}'.format(percentile): get_percentile(times, percentile) * 1000
+                             for percentile in PERCENTILES}
+            summary[name]['max'] = times[-1] * 1000 if times else 0
+        return summary
+
+    def format_summary(self):
+        summary = self.get_summary()
+        lines = ["[TIMINGS] {0} turns, {1} timeouts".format(summary['turns'], summary['timeouts'])]
+        for name in PHASES + ('total',):
+            stats = summary[name]
+            lines.append("[TIMINGS] {0:>8}: p50 {1:.2f} ms, p95 {2:.2f} ms, p99 {3:.2f} ms, max {4:.2f} ms".format(
+                name, stats['p50'], stats['p95'], stats['p99'], stats['max']))
+        return "\n".join(lines)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,72 @@
+import time
+
+# Time (in ms) held back from the allowed response time to encode and send the move
+SAFETY_MARGIN = 20
+
+
+class TurnBudget:
+    """
+    Time left to answer the current turn, counted with the monotonic clock from the moment the server's MOVE
+    arrived, so the time spent decoding the game state and updating the world is already taken off.
+
+    Bots get it as world.budget. Anytime searches can check it between iterations, e.g.
+
+        while not world.budget.should_stop(reserve=last_iteration_time):
+            ...
+
+    :ivar float arrival_time: time.monotonic() when the server's MOVE arrived.
+    :ivar int max_response_time: response time (in ms) allowed by the server.
+    :ivar float deadline: time.monotonic() by which do_move should return.
+    :ivar float end_time: time.monotonic() after which the server no longer takes the move.
+    :ivar bool cancelled: whether the work the budget was given for is no longer needed (see cancel).
+    """
+    def __init__(self, arrival_time, max_response_time, safety_margin=SAFETY_MARGIN):
+        """
+        :param arrival_time: time.monotonic() when the server's MOVE arrived.
+        :param max_response_time: response time (in ms) allowed by the server.
+        :param safety_margin: time (in ms) held back to encode and send the move.
+        """
+        self.arrival_time = arrival_time
+        self.max_response_time = max_response_time
+        self.deadline = arrival_time + max(0, max_response_time - safety_margin) / 1000
+        self.end_time = arrival_time + max_response_time / 1000
+        self.cancelled = False
+
+    def elapsed(self):
+        """
+        :return: seconds since the server's MOVE arrived.
+        :rtype: float
+        """
+        return time.monotonic() - self.arrival_time
+
+    def remaining(self):
+        """
+        :return: seconds left before the deadline, 0 once it has passed or the budget is cancelled.
+        :rtype: float
+        """
+        if self.should_stop():
+            return 0
+        return self.deadline - time.monotonic()
+
+    def should_stop(self, reserve=0):
+        """
+        :param reserve: seconds still needed after stopping, e.g. to finish the current iteration.
+        :return: whether the budget is cancelled or the deadline is less than reserve seconds away.
+        :rtype: bool
+        """
+        return self.cancelled or time.monotonic() + reserve >= self.deadline
+
+    def cancel(self):
+        """
+        Makes should_stop return True from now on, e.g. once the state a bot is pondering on is out of date.
+
+        :return: void
+        """
+        self.cancelled = True
+
+    def is_expired(self):
+        """
+        :return: whether the server no longer takes a move for this turn.
+        :rtype: bool
+        """
+        return time.monotonic() >= self.end_time
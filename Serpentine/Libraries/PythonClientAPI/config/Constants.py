@@ -3,4 +3,13 @@ import sys
 PLAYER_AI_PATH = sys.path[0]
 LOCAL_PLAYER_UUID = "UNKNOWN_PLAYER"
 MAP_NAME = ""
+MAPS_DIRECTORY = ""
+# How the client plays its turns: "thread" or "process" (see AIWorker), or "none" for a new thread every turn
+AI_WORKER_MODE = "thread"
+# Client protocol: "sync" (ClientHandlerProtocol) or "async" (AsyncClientHandlerProtocol, which ignores AI_WORKER_MODE)
+CLIENT_PROTOCOL = "sync"
+# Whether the bot keeps computing on the predicted next state between turns (see TurnRunner.ponder)
+PONDER = False
+# File to write the timings of every turn to (CSV if it ends with .csv, JSON lines otherwise), "" not to record them
+TIMINGS_FILE = ""
 EXTERNAL_LIB_DIR = "C:/Code/OC/2018/Game/Libraries/Lib"
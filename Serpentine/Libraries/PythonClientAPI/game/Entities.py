@@ -64,8 +64,8 @@ class Unit(Entity):
         self.position = tuple((position['x'], position['y']))
         self.team = team
         self.status = status
-        self.body = set([tuple((point['x'], point['y'])) for point in body])
-        self.territory = set([tuple((point['x'], point['y'])) for point in territory])
+        self.body = set((point['x'], point['y']) for point in body)
+        self.territory = set((point['x'], point['y']) for point in territory)
         self.turn_penalty = turn_penalty
 
     def __hash__(self):
@@ -96,13 +96,7 @@ class FriendlyUnit(Unit):
     def __init__(self, team, uuid, position, status, body, territory, turn_penalty):
         super().__init__(team, uuid, position, status, body, territory, turn_penalty)
         self.next_move_target = None
-        self.team = team
-        self.status = status
-        self.position = tuple((position['x'], position['y']))
-        self.body = set([tuple((point['x'], point['y'])) for point in body])
         self.snake = set([self.position]) | self.body
-        self.territory = set([tuple((point['x'], point['y'])) for point in territory])
-        self.turn_penalty = turn_penalty
 
     def move(self, point):
         """
@@ -127,10 +121,4 @@ class EnemyUnit(Unit):
 
     def __init__(self, team, uuid, position, status, body, territory, turn_penalty):
         super().__init__(team, uuid, position, status, body, territory, turn_penalty)
-        self.team = team
-        self.position = tuple((position['x'], position['y']))
-        self.status = status
-        self.body = set([tuple((point['x'], point['y'])) for point in body])
         self.snake = set([self.position]) | self.body
-        self.territory = set([tuple((point['x'], point['y'])) for point in territory])
-        self.turn_penalty = turn_penalty
@@ -20,7 +20,8 @@ class Direction(Enum):
         :param (int,int) point: (x,y) point
         :rtype: (int,int)
         """
-        return add_points(point, self.value)
+        delta = self.value
+        return (point[0] + delta[0], point[1] + delta[1])
 
 
 Direction._delta_to_direction = {
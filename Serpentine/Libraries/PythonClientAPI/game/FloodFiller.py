@@ -1,7 +1,71 @@
+import re
+
+_OPEN_RUN = re.compile(b'\x00+')
+_OUTSIDE = b'\x02'
+# Maps box values to 1 for filled points (loop and enclosed points) and 0 for outside points
+_FILLED = bytes([1, 1, 0]) + bytes(253)
+# Maps wall mask values to 1 for open points
+_OPEN = bytes([1]) + bytes(255)
+
+
+class FillResult:
+    """
+    Outcome of a candidate move for flood filling.
+
+    :ivar Direction direction: direction of the move.
+    :ivar tuple next_point: point the unit would move to.
+    :ivar int captured_count: number of points that would be added to the unit's territory.
+    :ivar bytearray captured_mask: 1 for every point that would be added to the unit's territory, if requested.
+    """
+    def __init__(self, direction, next_point, captured_count, captured_mask):
+        self.direction = direction
+        self.next_point = next_point
+        self.captured_count = captured_count
+        self.captured_mask = captured_mask
+
+    def __repr__(self):
+        return "{} -> {}: {} captured".format(self.direction, self.next_point, self.captured_count)
+
+
 class FloodFiller:
     def __init__(self, world):
         self.world = world
 
+    def evaluate_moves(self, unit, include_masks=False):
+        """
+        Returns what every legal next move of a unit would capture.
+        Legal moves are those to a neighbouring point that is neither a wall nor part of the unit's body.
+        All moves closing the loop (into the unit's territory) enclose the same area, so it is only filled once.
+
+        :param Unit unit: unit of interest.
+        :param include_masks: whether to compute the mask of captured points of every move.
+        :return: dictionary of direction to FillResult, for every legal move.
+        :rtype: dictionary
+        """
+        results = {}
+        capture = None
+        for direction, next_point in self.world.get_open_neighbours(unit.position).items():
+            if next_point in unit.body:
+                continue
+            if next_point not in unit.territory or len(unit.body) == 0:
+                results[direction] = FillResult(direction, next_point, 0, bytearray(len(self.world.walls)) if include_masks else None)
+                continue
+            if capture is None:
+                capture = self._get_capture(unit, next_point, include_masks)
+            captured_mask = bytearray(capture[1]) if include_masks else None
+            results[direction] = FillResult(direction, next_point, capture[0], captured_mask)
+        return results
+
+    def _get_capture(self, unit, next_point, include_masks):
+        mask = self.flood_fill_mask(unit.body, unit.territory, unit.position, next_point)
+        captured_count = mask.count(1) - len(unit.territory)
+        if not include_masks:
+            return captured_count, None
+        height = self.world.height
+        for x, y in unit.territory:
+            mask[x * height + y] = 0
+        return captured_count, mask
+
     def flood_fill(self, body, territory, unit, next_move):
         """
         Returns the tiles that will be filled given unit, body, territory locations, and the next move.
@@ -17,60 +81,106 @@ class FloodFiller:
         if len(body) == 0:
             return []
 
-        body.add(unit)
+        mask = self.flood_fill_mask(body, territory, unit, next_move)
+        points = self.world.points
         points_to_be_filled = set()
-        minX, maxX, minY, maxY = 300, -300, 300, -300
-
-        for point in territory:
-            if point[0] < minX:
-                minX = point[0]
-            if point[1] < minY:
-                minY = point[1]
-            if point[0] > maxX:
-                maxX = point[0]
-            if point[1] > maxY:
-                maxY = point[1]
-
-        for point in body:
-            if point[0] < minX:
-                minX = point[0]
-            if point[1] < minY:
-                minY = point[1]
-            if point[0] > maxX:
-                maxX = point[0]
-            if point[1] > maxY:
-                maxY = point[1]
-
-        start = (maxX + 1, maxY + 1)
-        visited = set()
-
-        print(minX, maxX, minY, maxY)
-
-        self.recursively_fill(minX, minY, maxX, maxY, start, visited, territory, body)
-
-        for i in range(minX - 1, maxX + 2):
-            for j in range(minY - 1, maxY + 2):
-                if (i, j) not in visited and not self.world.is_wall((i, j)):
-                    points_to_be_filled.add((i, j))
-
+        index = mask.find(1)
+        while index >= 0:
+            points_to_be_filled.add(points[index])
+            index = mask.find(1, index + 1)
         return points_to_be_filled
 
-    def recursively_fill(self, minX, minY, maxX, maxY, point, visited, territory, body):
-        if point[0] < minX - 1 or point[0] > maxX + 1:
-            return
-        if point[1] < minY - 1 or point[1] > maxY + 1:
-            return
-        if point in territory:
-            return
-        if point in body:
-            return
-        visited.add(point)
-
-        if not (point[0] - 1, point[1]) in visited:
-            self.recursively_fill(minX, minY, maxX, maxY, (point[0] - 1, point[1]), visited, territory, body)
-        if not (point[0] + 1, point[1]) in visited:
-            self.recursively_fill(minX, minY, maxX, maxY, (point[0] + 1, point[1]), visited, territory, body)
-        if not (point[0], point[1] - 1) in visited:
-            self.recursively_fill(minX, minY, maxX, maxY, (point[0], point[1] - 1), visited, territory, body)
-        if not (point[0], point[1] + 1) in visited:
-            self.recursively_fill(minX, minY, maxX, maxY, (point[0], point[1] + 1), visited, territory, body)
\ No newline at end of file
+    def flood_fill_mask(self, body, territory, unit, next_move):
+        """
+        Returns the tiles that will be filled given unit, body, territory locations, and the next move, as a mask.
+        Filled tiles are the existing territory, the body, the unit and everything they enclose.
+
+        :param body: set of points of the body of the snake.
+        :param territory: set of points of the territory of the snake.
+        :param unit: point that the unit is on.
+        :param next_move: next move that will be made by the unit.
+        :return: 1 for every filled point, indexed like the planes of the world (all 0 if nothing will be filled).
+        :rtype: bytearray
+        """
+        world = self.world
+        mask = bytearray(world.width * world.height)
+        if next_move not in territory or len(body) == 0:
+            return mask
+
+        box, min_x, min_y, box_height = self._fill_box(body, territory, unit)
+        walls = world.walls
+        height = world.height
+        for column_start in range(0, len(box), box_height):
+            offset = (min_x + column_start // box_height) * height + min_y
+            filled = int.from_bytes(box[column_start:column_start + box_height].translate(_FILLED), 'big')
+            open_points = int.from_bytes(walls[offset:offset + box_height].translate(_OPEN), 'big')
+            mask[offset:offset + box_height] = (filled & open_points).to_bytes(box_height, 'big')
+        return mask
+
+    def _fill_box(self, body, territory, unit):
+        """
+        Flood fills the outside of the loop formed by body, territory and unit, within their bounding box grown by 1.
+        The given collections are not modified and walls are treated like open tiles.
+
+        :return: (box, min_x, min_y, box_height) where box holds, column by column, 1 for the points of the loop,
+                 2 for points outside of it and 0 for enclosed points.
+        """
+        world = self.world
+        min_x = max_x = unit[0]
+        min_y = max_y = unit[1]
+        for points in (territory, body):
+            for x, y in points:
+                if x < min_x:
+                    min_x = x
+                elif x > max_x:
+                    max_x = x
+                if y < min_y:
+                    min_y = y
+                elif y > max_y:
+                    max_y = y
+
+        min_x = max(min_x - 1, 0)
+        min_y = max(min_y - 1, 0)
+        max_x = min(max_x + 1, world.width - 1)
+        max_y = min(max_y + 1, world.height - 1)
+        box_width = max_x - min_x + 1
+        box_height = max_y - min_y + 1
+        size = box_width * box_height
+
+        box = bytearray(size)
+        for points in (territory, body, (unit,)):
+            for x, y in points:
+                box[(x - min_x) * box_height + y - min_y] = 1
+
+        # Scanline fill: find the runs of open points of every column, then spread "outside" between overlapping runs
+        # of neighbouring columns, starting from the runs touching the border of the box
+        columns = []
+        for column_start in range(0, size, box_height):
+            columns.append([(match.start(), match.end())
+                            for match in _OPEN_RUN.finditer(box, column_start, column_start + box_height)])
+
+        outside = [[False] * len(runs) for runs in columns]
+        stack = []
+        for column, runs in enumerate(columns):
+            column_start = column * box_height
+            for run, (start, end) in enumerate(runs):
+                if column == 0 or column == box_width - 1 or start == column_start or end == column_start + box_height:
+                    outside[column][run] = True
+                    stack.append((column, run))
+
+        while stack:
+            column, run = stack.pop()
+            start, end = columns[column][run]
+            box[start:end] = _OUTSIDE * (end - start)
+            for neighbour_column in (column - 1, column + 1):
+                if not 0 <= neighbour_column < box_width:
+                    continue
+                shift = (neighbour_column - column) * box_height
+                neighbour_outside = outside[neighbour_column]
+                for neighbour_run, (neighbour_start, neighbour_end) in enumerate(columns[neighbour_column]):
+                    if neighbour_start - shift < end and neighbour_end - shift > start and \
+                            not neighbour_outside[neighbour_run]:
+                        neighbour_outside[neighbour_run] = True
+                        stack.append((neighbour_column, neighbour_run))
+
+        return box, min_x, min_y, box_height
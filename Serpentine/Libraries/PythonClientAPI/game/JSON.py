@@ -15,18 +15,20 @@ def parse_config(jsn, player_index):
     comm_constants.MAXIMUM_ALLOWED_RESPONSE_TIME = int(dct["maxResponseTime"])
 
 
-def parse_game_state(jsn, tiles):
+def parse_game_state(jsn, tiles, world=None, layout=None, local_uuid=None):
     dct = json.loads(jsn)
-    return as_game_state(dct, tiles)
+    return as_game_state(dct, tiles, world, layout, local_uuid)
 
 
-def as_game_state(dct, tiles):
+def as_game_state(dct, tiles, world=None, layout=None, local_uuid=None):
+    if local_uuid is None:
+        local_uuid = constants.LOCAL_PLAYER_UUID
     player_uuid_to_player_type_map = {}
     enemy_units_map = {}
     enemy_uuids = []
 
     for uuid in dct['playerUUIDToPlayerTypeMap'].keys():
-        if uuid == constants.LOCAL_PLAYER_UUID:
+        if uuid == local_uuid:
             player_state = as_friendly_player_state(dct['playerUUIDToPlayerTypeMap'][uuid])
             friendly_unit = player_state.friendly_unit
         else:
@@ -38,7 +40,10 @@ def as_game_state(dct, tiles):
     player_index_to_uuid_map = {player_index: dct['playerIndexToUUIDMap'][player_index]
                                 for player_index in dct['playerIndexToUUIDMap'].keys()}
 
-    world = World(tiles, friendly_unit, enemy_units_map)
+    if world is None:
+        world = World(tiles, friendly_unit, enemy_units_map, layout)
+    else:
+        world.update(friendly_unit, enemy_units_map)
 
     return GameState(world, player_uuid_to_player_type_map, player_index_to_uuid_map, enemy_uuids)
 
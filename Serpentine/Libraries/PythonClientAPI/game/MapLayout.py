@@ -0,0 +1,66 @@
+from PythonClientAPI.game.Enums import TileType, Direction
+
+
+class MapLayout:
+    """
+    Static (turn-independent) structure of a map, built once when the tiles are received and shared by every World.
+    Cells are indexed by ``x * height + y``.
+
+    :ivar int width: width of the map, including walls.
+    :ivar int height: height of the map, including walls.
+    :ivar bytearray walls: 1 where the cell is a wall, 0 otherwise.
+    :ivar list points: point of every index.
+    :ivar list open_neighbours: indices of the in-bounds, non-wall neighbours of every index, in Direction.ORDERED_DIRECTIONS order.
+    :ivar list open_neighbour_maps: dictionary of direction to in-bounds, non-wall neighbouring point of every index.
+    """
+    def __init__(self, tiles):
+        self.tiles = tiles
+        self.width = len(tiles)
+        self.height = len(tiles[0])
+        self.walls = self._build_wall_mask(tiles)
+        self.points = [(x, y) for x in range(self.width) for y in range(self.height)]
+        self.open_neighbour_maps = self._build_neighbour_maps()
+        self.open_neighbours = [tuple(self.get_index(point) for point in neighbours.values())
+                                for neighbours in self.open_neighbour_maps]
+
+    def _build_wall_mask(self, tiles):
+        walls = bytearray(self.width * self.height)
+        index = 0
+        for column in tiles:
+            for tile_type in column:
+                if tile_type == TileType.WALL:
+                    walls[index] = 1
+                index += 1
+        return walls
+
+    def _build_neighbour_maps(self):
+        neighbour_maps = []
+        for x, y in self.points:
+            neighbours = {}
+            for direction in Direction.ORDERED_DIRECTIONS:
+                nx = x + direction.value[0]
+                ny = y + direction.value[1]
+                if 0 <= nx < self.width and 0 <= ny < self.height and not self.walls[nx * self.height + ny]:
+                    neighbours[direction] = (nx, ny)
+            neighbour_maps.append(neighbours)
+        return neighbour_maps
+
+    def get_index(self, point):
+        """
+        Returns the index of a point.
+
+        :param point: point of interest.
+        :return: x * height + y.
+        :rtype: int
+        """
+        return point[0] * self.height + point[1]
+
+    def is_wall(self, point):
+        """
+        Returns a boolean indicating whether the point is a wall.
+
+        :param point: point of interest.
+        :return: true if point is wall.
+        :rtype: bool
+        """
+        return self.walls[point[0] * self.height + point[1]] == 1
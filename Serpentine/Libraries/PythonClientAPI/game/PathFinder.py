@@ -1,3 +1,5 @@
+import heapq
+
 from PythonClientAPI.structures.Collections import PriorityQueue, Queue
 from PythonClientAPI.game.Enums import TileType, Direction, Team
 from PythonClientAPI.game.PointUtils import *
@@ -23,6 +25,9 @@ class PathFinder:
         """
         Returns a list of points (in order) showing the shortest path between 2 points.
 
+        When the navigation cache is loaded, the cached route is returned as long as it doesn't cross any avoided point,
+        otherwise an A* search guided by the cached (wall-aware) distances is run.
+
         :param start: start point.
         :param end: end point.
         :param avoid: collection of points to avoid.
@@ -32,42 +37,61 @@ class PathFinder:
         if start == end: return [end]
         if self.world.is_wall(start) or self.world.is_wall(end): return None
 
-        queue = PriorityQueue()
-
-        queue.add(start, 0)
-
-        inverted_tree = {}
-        movement_costs = {}
-
-        inverted_tree[start] = None
-        movement_costs[start] = 0
-
-        while not queue.is_empty():
-            current = queue.poll()
+        if not navigation_cache.loaded:
+            return self._get_a_star_path(start, end, avoid, self.get_taxi_cab_distance)
+
+        if navigation_cache.get_distance(start, end) == 0:
+            return None
+        path = self._get_cached_path(start, end)
+        if not avoid or not any(point in avoid for point in path):
+            return path
+        return self._get_a_star_path(start, end, avoid, navigation_cache.get_distance)
+
+    def _get_cached_path(self, start, end):
+        path = []
+        cursor = start
+        while cursor != end:
+            cursor = navigation_cache.get_next_direction_in_path(cursor, end).move_point(cursor)
+            path.append(cursor)
+        return path
+
+    def _get_a_star_path(self, start, end, avoid, heuristic):
+        world = self.world
+        points = world.points
+        open_neighbours = world.open_neighbours
+        start_index = world.get_index(start)
+        end_index = world.get_index(end)
+
+        queue = [(0, 0, start_index)]
+        count = 1
+
+        inverted_tree = [-1] * len(points)
+        movement_costs = [-1] * len(points)
+
+        movement_costs[start_index] = 0
+
+        while queue:
+            current = heapq.heappop(queue)[2]
+
+            if current == end_index:
+                path = []
+                cursor = end_index
+                while cursor != start_index:
+                    path.append(points[cursor])
+                    cursor = inverted_tree[cursor]
+                path.reverse()
+                return path
 
-            neighbours = self.world.get_neighbours(current)
-            for direction in Direction.ORDERED_DIRECTIONS:
-                neighbour = neighbours[direction]
-                if self.world.is_wall(neighbour) or (avoid and (neighbour in avoid)):
+            cost = movement_costs[current] + 1
+            for neighbour in open_neighbours[current]:
+                if avoid and (points[neighbour] in avoid):
                     continue
-                cost = movement_costs[current] + 1
-                if (neighbour not in movement_costs) or (cost < movement_costs[neighbour]):
+                if movement_costs[neighbour] < 0 or cost < movement_costs[neighbour]:
                     movement_costs[neighbour] = cost
-                    queue.add(neighbour,
-                              cost + self.get_taxi_cab_distance(neighbour, end))
+                    heapq.heappush(queue, (cost + heuristic(points[neighbour], end), count, neighbour))
+                    count += 1
                     inverted_tree[neighbour] = current
 
-            if current == end:
-                path = []
-                cursor = end
-                peek_cursor = inverted_tree[cursor]
-                while peek_cursor:
-                    path.append(cursor)
-                    cursor = peek_cursor
-                    peek_cursor = inverted_tree[cursor]
-                path.reverse()
-                return path
-
         return None
 
     def get_shortest_path_distance(self, start, end):
@@ -1,3 +1,5 @@
+from collections import deque
+
 from PythonClientAPI.structures.Collections import PriorityQueue, Queue
 from PythonClientAPI.game.Enums import TileType, Direction, Team
 from PythonClientAPI.game.PointUtils import *
@@ -19,26 +21,117 @@ class TileUtils:
         :return: closest point from source that satisfies condition.
         :rtype: tuple
         """
-        queue = Queue()
-        visited = set()
-        queue.add(source)
-        visited.add(source)
+        world = self.world
+        points = world.points
+        open_neighbours = world.open_neighbours
+        source_index = world.get_index(source)
+
+        queue = deque([source_index])
+        visited = bytearray(len(points))
+        visited[source_index] = 1
 
-        while not (queue.is_empty()):
-            cursor = queue.poll()
-            neighbours = self.world.get_neighbours(cursor)
+        while queue:
+            cursor = queue.popleft()
 
-            for direction in Direction.ORDERED_DIRECTIONS:
-                neighbour = neighbours[direction]
-                if not ((neighbour in visited) or self.world.is_wall(neighbour)):
-                    queue.add(neighbour)
-                    visited.add(neighbour)
+            for neighbour in open_neighbours[cursor]:
+                if not visited[neighbour]:
+                    queue.append(neighbour)
+                    visited[neighbour] = 1
 
-            if condition(cursor):
-                return cursor
+            if condition(points[cursor]):
+                return points[cursor]
 
         return None
 
+    def get_distance_field(self, plane, codes):
+        """
+        Returns the distance (in moves) from every point to the closest point whose value in the given plane of the world
+        is one of the given team codes, computed with one multi-source breadth first search.
+        Fields are cached on the world until a point enters or leaves their sources.
+
+        :param plane: name of the plane of the world ('owners', 'bodies' or 'heads').
+        :param codes: team codes of interest (see World.teams), 0 standing for nobody.
+        :return: list of distances indexed like the planes of the world, -1 where no such point can be reached.
+        :rtype: list
+        """
+        key = (plane, tuple(sorted(codes)))
+        field = self.world.distance_fields.get(key)
+        if field is not None:
+            return field
+
+        world = self.world
+        walls = world.walls
+        values = getattr(world, plane)
+        open_neighbours = world.open_neighbours
+        codes = set(codes)
+
+        field = [-1] * len(walls)
+        frontier = [index for index in range(len(walls)) if values[index] in codes and not walls[index]]
+        for index in frontier:
+            field[index] = 0
+
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for index in frontier:
+                for neighbour in open_neighbours[index]:
+                    if field[neighbour] < 0:
+                        field[neighbour] = distance
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+        self.world.distance_fields[key] = field
+        return field
+
+    def get_closest_point_in_field(self, source, field):
+        """
+        Returns the closest point from a given point that is at distance 0 in a distance field,
+        by walking down the field.
+
+        :param source: point of interest.
+        :param field: distance field, as returned by get_distance_field.
+        :return: closest point from source at distance 0, or None if there is none.
+        :rtype: tuple
+        """
+        world = self.world
+        open_neighbours = world.open_neighbours
+        cursor = world.get_index(source)
+        if world.walls[cursor]:
+            reachable = [neighbour for neighbour in open_neighbours[cursor] if field[neighbour] >= 0]
+            if not reachable:
+                return None
+            cursor = min(reachable, key=lambda neighbour: field[neighbour])
+
+        distance = field[cursor]
+        if distance < 0:
+            return None
+        while distance > 0:
+            distance -= 1
+            for neighbour in open_neighbours[cursor]:
+                if field[neighbour] == distance:
+                    cursor = neighbour
+                    break
+        return world.points[cursor]
+
+    def _get_closest_tile(self, point, excluding_points, plane, codes, condition):
+        if not self.world.is_within_bounds(point):
+            return None
+        if excluding_points:
+            target = self.get_closest_point_from(point, lambda p: condition(p) and p not in excluding_points)
+        else:
+            target = self.get_closest_point_in_field(point, self.get_distance_field(plane, codes))
+        if target is not None:
+            return self.world.position_to_tile_map[target]
+        return None
+
+    def _get_enemy_codes(self):
+        return range(2, len(self.world.teams))
+
+    def _get_team_codes(self, team):
+        code = self.world.team_to_code.get(team)
+        return () if code is None else (code,)
+
     def get_closest_neutral_territory_from(self, point, excluding_points):
         """
         Returns the closest tile that isn't owned by any team from a given point.
@@ -48,12 +141,8 @@ class TileUtils:
         :return: closest neutral tile from point.
         :rtype: Tile
         """
-        if not self.world.is_within_bounds(point):
-            return None
-        target = self.get_closest_point_from(point, lambda p: self.world.position_to_tile_map[p].is_neutral and ((not excluding_points) or (p not in excluding_points)))
-        if target is not None:
-            return self.world.position_to_tile_map[target]
-        return None
+        return self._get_closest_tile(point, excluding_points, 'owners', (0,),
+                                      lambda p: self.world.position_to_tile_map[p].is_neutral)
 
     def get_closest_capturable_territory_from(self, point, excluding_points):
         """
@@ -64,12 +153,8 @@ class TileUtils:
         :return: closest capturable tile from point.
         :rtype: Tile
         """
-        if not self.world.is_within_bounds(point):
-            return None
-        target = self.get_closest_point_from(point, lambda p: (self.world.position_to_tile_map[p].is_neutral or self.world.position_to_tile_map[p].is_enemy) and ((not excluding_points) or (p not in excluding_points)))
-        if target is not None:
-            return self.world.position_to_tile_map[target]
-        return None
+        return self._get_closest_tile(point, excluding_points, 'owners', (0,) + tuple(self._get_enemy_codes()),
+                                      lambda p: (self.world.position_to_tile_map[p].is_neutral or self.world.position_to_tile_map[p].is_enemy))
 
     def get_closest_friendly_territory_from(self, point, excluding_points):
         """
@@ -80,12 +165,8 @@ class TileUtils:
         :return: closest friendly tile from point.
         :rtype: Tile
         """
-        if not self.world.is_within_bounds(point):
-            return None
-        target = self.get_closest_point_from(point, lambda p: self.world.position_to_tile_map[p].is_friendly and ((not excluding_points) or (p not in excluding_points)))
-        if target is not None:
-            return self.world.position_to_tile_map[target]
-        return None
+        return self._get_closest_tile(point, excluding_points, 'owners', (1,),
+                                      lambda p: self.world.position_to_tile_map[p].is_friendly)
 
     def get_closest_enemy_territory_from(self, point, excluding_points):
         """
@@ -96,12 +177,8 @@ class TileUtils:
         :return: closest enemy tile from point.
         :rtype: Tile
         """
-        if not self.world.is_within_bounds(point):
-            return None
-        target = self.get_closest_point_from(point, lambda p: self.world.position_to_tile_map[p].is_enemy and ((not excluding_points) or (p not in excluding_points)))
-        if target is not None:
-            return self.world.position_to_tile_map[target]
-        return None
+        return self._get_closest_tile(point, excluding_points, 'owners', self._get_enemy_codes(),
+                                      lambda p: self.world.position_to_tile_map[p].is_enemy)
 
     def get_closest_territory_by_team(self, point, team, excluding_points):
         """
@@ -113,12 +190,8 @@ class TileUtils:
         :return: closest tile from point that belongs to the team of interest.
         :rtype: Tile
         """
-        if not self.world.is_within_bounds(point):
-            return None
-        target = self.get_closest_point_from(point, lambda p: self.world.position_to_tile_map[p].owner == team and ((not excluding_points) or (p not in excluding_points)))
-        if target is not None:
-            return self.world.position_to_tile_map[target]
-        return None
+        return self._get_closest_tile(point, excluding_points, 'owners', self._get_team_codes(team),
+                                      lambda p: self.world.position_to_tile_map[p].owner == team)
 
     def get_closest_friendly_body_from(self, point, excluding_points):
         """
@@ -129,12 +202,8 @@ class TileUtils:
         :return: closest tile from point that has a friendly body on it.
         :rtype: Tile
         """
-        if not self.world.is_within_bounds(point):
-            return None
-        target = self.get_closest_point_from(point, lambda p: self.world.position_to_tile_map[p].body == self.friendly_unit.team and ((not excluding_points) or (p not in excluding_points)))
-        if target is not None:
-            return self.world.position_to_tile_map[target]
-        return None
+        return self._get_closest_tile(point, excluding_points, 'bodies', (1,),
+                                      lambda p: self.world.position_to_tile_map[p].body == self.friendly_unit.team)
 
     def get_closest_enemy_body_from(self, point, excluding_points):
         """
@@ -145,12 +214,8 @@ class TileUtils:
         :return: closest tile from point that has an enemy body on it.
         :rtype: Tile
         """
-        if not self.world.is_within_bounds(point):
-            return None
-        target = self.get_closest_point_from(point, lambda p: self.world.position_to_tile_map[p].body in self.enemy_units_map.keys() and ((not excluding_points) or (p not in excluding_points)))
-        if target is not None:
-            return self.world.position_to_tile_map[target]
-        return None
+        return self._get_closest_tile(point, excluding_points, 'bodies', self._get_enemy_codes(),
+                                      lambda p: self.world.position_to_tile_map[p].body in self.enemy_units_map.keys())
 
     def get_closest_body_by_team(self, point, team, excluding_points):
         """
@@ -161,12 +226,8 @@ class TileUtils:
         :return: closest tile from point that has a body of a given point on it.
         :rtype: Tile
         """
-        if not self.world.is_within_bounds(point):
-            return None
-        target = self.get_closest_point_from(point, lambda p: self.world.position_to_tile_map[p].body == team and ((not excluding_points) or (p not in excluding_points)))
-        if target is not None:
-            return self.world.position_to_tile_map[target]
-        return None
+        return self._get_closest_tile(point, excluding_points, 'bodies', self._get_team_codes(team),
+                                      lambda p: self.world.position_to_tile_map[p].body == team)
 
     def get_closest_enemy_head_from(self, point, excluding_points):
         """
@@ -177,12 +238,8 @@ class TileUtils:
         :return: closest tile from point that has an enemy head on it.
         :rtype: Tile
         """
-        if not self.world.is_within_bounds(point):
-            return None
-        target = self.get_closest_point_from(point, lambda p: self.world.position_to_tile_map[p].head in self.enemy_units_map.keys() and ((not excluding_points) or (p not in excluding_points)))
-        if target is not None:
-            return self.world.position_to_tile_map[target]
-        return None
+        return self._get_closest_tile(point, excluding_points, 'heads', self._get_enemy_codes(),
+                                      lambda p: self.world.position_to_tile_map[p].head in self.enemy_units_map.keys())
 
     def get_closest_head_by_team(self, point, team, excluding_points):
         """
@@ -193,12 +250,8 @@ class TileUtils:
         :return: closest tile from point that has the head of a given team on it.
         :rtype: Tile
         """
-        if not self.world.is_within_bounds(point):
-            return None
-        target = self.get_closest_point_from(point, lambda p: self.world.position_to_tile_map[p].head == team and ((not excluding_points) or (p not in excluding_points)))
-        if target is not None:
-            return self.world.position_to_tile_map[target]
-        return None
+        return self._get_closest_tile(point, excluding_points, 'heads', self._get_team_codes(team),
+                                      lambda p: self.world.position_to_tile_map[p].head == team)
 
     def get_friendly_territory_edges(self):
         """
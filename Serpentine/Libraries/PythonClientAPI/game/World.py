@@ -1,87 +1,224 @@
+from collections.abc import Mapping
+
 from PythonClientAPI.game.Enums import TileType, Direction
 from PythonClientAPI.game.Entities import Tile
+from PythonClientAPI.game.MapLayout import MapLayout
 from PythonClientAPI.game.TileUtils import TileUtils
 from PythonClientAPI.game.FloodFiller import FloodFiller
 from PythonClientAPI.game.PathFinder import PathFinder
 
 
+class TileMap(Mapping):
+    """
+    Read-only dictionary view of the world's tiles, keyed by tuple position.
+    Tile objects are only created (and then cached) when they are looked up.
+    """
+    def __init__(self, world):
+        self.world = world
+        self._tiles = {}
+
+    def __getitem__(self, point):
+        tile = self._tiles.get(point)
+        if tile is None:
+            if not self.world.is_within_bounds(point):
+                raise KeyError(point)
+            tile = self.world._create_tile(point)
+            self._tiles[point] = tile
+        return tile
+
+    def __contains__(self, point):
+        return self.world.is_within_bounds(point)
+
+    def __iter__(self):
+        for x in range(self.world.width):
+            for y in range(self.world.height):
+                yield (x, y)
+
+    def __len__(self):
+        return self.world.width * self.world.height
+
+
 class World:
     """
-    Represents a colour-changing tile on the board.
+    Represents the game map and every unit on it.
+
+    The map state is kept as flat bytearray planes indexed by ``x * height + y`` (see ``get_index``).
+    Owner, body and head planes hold a team code (0 for nobody) which maps to a team through ``teams``.
 
     :ivar position_to_tile_map: dictionary of tuple positions to corresponding Tile objects.
+    :ivar MapLayout layout: static structure of the map, shared between turns.
+    :ivar bytearray walls: 1 where the cell is a wall, 0 otherwise (from the layout).
+    :ivar list points: point of every index (from the layout).
+    :ivar list open_neighbours: indices of the in-bounds, non-wall neighbours of every index (from the layout).
+    :ivar bytearray owners: team code of the territory on each cell.
+    :ivar bytearray bodies: team code of the body on each cell.
+    :ivar bytearray heads: team code of the head on each cell.
+    :ivar list teams: team of each team code; code 1 is always the friendly team.
+    :ivar set changed_points: points whose owner, body or head changed in the last update (every point on a new world).
+    :ivar dict distance_fields: distance fields computed by TileUtils.get_distance_field, kept across updates
+                                that leave their sources unchanged.
     :ivar PathFinder path: instance of PathFinder class - access methods by calling world.path...
     :ivar TileUtils util: instance of TileUtils class - access methods by calling world.util...
     :ivar FloodFiller fill: instance of FloodFiller class - access methods by calling world.fill...
+    :ivar TurnBudget budget: time left to answer the current turn, set by the client before calling do_move.
     """
-    def __init__(self, tiles, friendly_unit, enemy_units_map):
-        self.position_to_tile_map = {}
+    def __init__(self, tiles, friendly_unit, enemy_units_map, layout=None):
         self.tiles = tiles
         self.width = len(tiles)
         self.height = len(tiles[0])
         self.friendly_unit = friendly_unit
         self.enemy_units_map = enemy_units_map
-        self._set_position_to_tile_map(tiles, friendly_unit, enemy_units_map)
-        self.neutral_points = self._deduce_neutral_territory(tiles, friendly_unit, enemy_units_map)
+        self.layout = layout if layout is not None else MapLayout(tiles)
+        self.walls = self.layout.walls
+        self.points = self.layout.points
+        self.open_neighbours = self.layout.open_neighbours
+        self._set_planes(friendly_unit, enemy_units_map)
+        self.position_to_tile_map = TileMap(self)
+        self._neutral_points = None
+        self.changed_points = set(self.position_to_tile_map)
+        self.distance_fields = {}
         self.path = PathFinder(self)
         self.util = TileUtils(self, friendly_unit, enemy_units_map)
         self.fill = FloodFiller(self)
+        self.budget = None
+
+    def _set_planes(self, friendly_unit, enemy_units_map):
+        size = self.width * self.height
+        self.owners = bytearray(size)
+        self.bodies = bytearray(size)
+        self.heads = bytearray(size)
+        self.teams = [None]
+        self.team_to_code = {}
+
+        for unit in [friendly_unit] + list(enemy_units_map.values()):
+            code = len(self.teams)
+            self.teams.append(unit.team)
+            self.team_to_code[unit.team] = code
+            self._paint_unit(unit, code)
+
+    def _paint_unit(self, unit, code):
+        height = self.height
+        owners = self.owners
+        bodies = self.bodies
+        for x, y in unit.territory:
+            owners[x * height + y] = code
+        for x, y in unit.body:
+            bodies[x * height + y] = code
+        self.heads[unit.position[0] * height + unit.position[1]] = code
+
+    def update(self, friendly_unit, enemy_units_map):
+        """
+        Moves the world to a new turn by patching only the cells whose owner, body or head changed.
+        The patched points are stored in changed_points.
+        Falls back to a full rebuild when the set of teams is not the same as in the previous turn.
+
+        :param FriendlyUnit friendly_unit: friendly unit of the new turn.
+        :param enemy_units_map: dictionary of team to EnemyUnit of the new turn.
+        :return: void
+        """
+        old_units = [self.friendly_unit] + list(self.enemy_units_map.values())
+        new_units = [friendly_unit] + list(enemy_units_map.values())
+        self.friendly_unit = friendly_unit
+        self.enemy_units_map = enemy_units_map
+        self.util.friendly_unit = friendly_unit
+        self.util.enemy_units_map = enemy_units_map
+
+        if [unit.team for unit in old_units] != [unit.team for unit in new_units]:
+            self._set_planes(friendly_unit, enemy_units_map)
+            self.position_to_tile_map = TileMap(self)
+            self._neutral_points = None
+            self.changed_points = set(self.position_to_tile_map)
+            self.distance_fields = {}
+            return
 
-    def _deduce_neutral_territory(self, tiles, friendly_unit, enemy_units_map):
-        neutral_points = set()
-
-        for x in range(len(tiles)):
-            for y in range(len(tiles[0])):
-                neutral = True
-                if tiles[x][y] == TileType.WALL or (x, y) in friendly_unit.territory:
-                    neutral = False
-                for key in enemy_units_map:
-                    if (x, y) in enemy_units_map[key].territory:
-                        neutral = False
-                        break
-                if neutral:
-                    neutral_points.add((x, y))
-                    if (x, y) in self.position_to_tile_map.keys():
-                        self.position_to_tile_map[(x, y)].is_neutral = True
-                    else:
-                        self.position_to_tile_map[(x, y)] = Tile(self, True, False, False, self.is_edge((x, y)), False, None, None, None, (x, y))
-        return neutral_points
-
-    def _set_position_to_tile_map(self, tiles, friendly_unit, enemy_units_map):
-        for x in range(len(tiles)):
-            for y in range(len(tiles[0])):
-                pos = (x, y)
-                tile = Tile(self, False, False, False, False, False, None, None, None, (x, y))
-
-                if self.is_wall(pos):
-                    tile.is_wall = True
-
-                if self.is_edge(pos):
-                    tile.is_edge = True
-
-                if pos == friendly_unit.position:
-                    tile.head = friendly_unit.team
-
-                if pos in friendly_unit.body:
-                    tile.body = friendly_unit.team
-
-                if pos in friendly_unit.territory:
-                    tile.owner = friendly_unit.team
-                    tile.is_friendly = True
-
-                for key in enemy_units_map:
-                    enemy_unit = enemy_units_map[key]
-                    if pos == enemy_unit.position:
-                        tile.head = enemy_unit.team
-
-                    if pos in enemy_unit.body:
-                        tile.body = enemy_unit.team
-
-                    if pos in enemy_unit.territory:
-                        tile.owner = enemy_unit.team
-                        tile.is_enemy = True
-
-                self.position_to_tile_map[pos] = tile
+        changed_points = set()
+        for old_unit, new_unit in zip(old_units, new_units):
+            changed_points |= old_unit.territory ^ new_unit.territory
+            changed_points |= old_unit.body ^ new_unit.body
+            if old_unit.position != new_unit.position:
+                changed_points.add(old_unit.position)
+                changed_points.add(new_unit.position)
+
+        height = self.height
+        tile_cache = self.position_to_tile_map._tiles
+        # (old code, new code) of every cell that changed, per plane
+        code_changes = {'owners': set(), 'bodies': set(), 'heads': set()}
+        for point in changed_points:
+            owner = body = head = 0
+            for code, unit in enumerate(new_units, 1):
+                if point in unit.territory:
+                    owner = code
+                if point in unit.body:
+                    body = code
+                if point == unit.position:
+                    head = code
+            index = point[0] * height + point[1]
+            if self.owners[index] != owner:
+                code_changes['owners'].add((self.owners[index], owner))
+            if self.bodies[index] != body:
+                code_changes['bodies'].add((self.bodies[index], body))
+            if self.heads[index] != head:
+                code_changes['heads'].add((self.heads[index], head))
+            self.owners[index] = owner
+            self.bodies[index] = body
+            self.heads[index] = head
+            tile_cache.pop(point, None)
+            if self._neutral_points is not None:
+                if owner == 0 and self.walls[index] == 0:
+                    self._neutral_points.add(point)
+                else:
+                    self._neutral_points.discard(point)
+
+        self.changed_points = changed_points
+        # A distance field only depends on its plane's cells holding one of its codes, so it stays valid
+        # as long as no cell entered or left that set
+        self.distance_fields = {key: field for key, field in self.distance_fields.items()
+                                if not any((old in key[1]) != (new in key[1]) for old, new in code_changes[key[0]])}
+
+    def _create_tile(self, point):
+        index = point[0] * self.height + point[1]
+        is_wall = self.walls[index] == 1
+        owner_code = self.owners[index]
+        return Tile(self,
+                    not is_wall and owner_code == 0,
+                    owner_code == 1,
+                    owner_code > 1,
+                    self.is_edge(point),
+                    is_wall,
+                    self.teams[owner_code],
+                    self.teams[self.bodies[index]],
+                    self.teams[self.heads[index]],
+                    point)
+
+    @property
+    def neutral_points(self):
+        if self._neutral_points is None:
+            height = self.height
+            walls = self.walls
+            owners = self.owners
+            self._neutral_points = set((index // height, index % height) for index in range(len(owners))
+                                       if owners[index] == 0 and walls[index] == 0)
+        return self._neutral_points
+
+    def get_index(self, point):
+        """
+        Returns the index of a point in the flat planes of the world.
+
+        :param point: point of interest.
+        :return: x * height + y.
+        :rtype: int
+        """
+        return point[0] * self.height + point[1]
+
+    def get_point(self, index):
+        """
+        Returns the point corresponding to an index in the flat planes of the world.
+
+        :param index: index of interest.
+        :return: (x, y) point.
+        :rtype: tuple
+        """
+        return divmod(index, self.height)
 
     def get_width(self):
         """
@@ -122,7 +259,7 @@ class World:
         :return: true if point is wall.
         :rtype: bool
         """
-        return self.tiles[point[0]][point[1]] == TileType.WALL
+        return self.walls[point[0] * self.height + point[1]] == 1
 
     def is_edge(self, point):
         """
@@ -155,10 +292,20 @@ class World:
         :return: dictionary of direction to neighbours.
         :rtype: dictionary
         """
-        neighbours = {}
-        for direction in Direction.ORDERED_DIRECTIONS:
-            neighbours[direction] = direction.move_point(point)
-        return neighbours
+        x, y = point
+        return {Direction.NORTH: (x, y - 1), Direction.EAST: (x + 1, y),
+                Direction.SOUTH: (x, y + 1), Direction.WEST: (x - 1, y)}
+
+    def get_open_neighbours(self, point):
+        """
+        Returns a dictionary of direction to neighbouring points that are in bounds and not walls.
+        The dictionary is shared with the map layout and must not be modified.
+
+        :param point: point of interest (must be in bounds).
+        :return: dictionary of direction to open neighbours.
+        :rtype: dictionary
+        """
+        return self.layout.open_neighbour_maps[point[0] * self.height + point[1]]
 
     def get_unit_by_team(self, team):
         """
@@ -1,31 +1,44 @@
-from zipfile import ZipFile
+import mmap
+import os
+import sys
+import threading
+from zipfile import ZipFile, BadZipFile
 
-from PythonClientAPI.game.Enums import Direction
+import PythonClientAPI.config.Constants as constants
+from PythonClientAPI.game.Enums import Direction, TileType
+from PythonClientAPI.navigation.NavigationCacheCompiler import compile_navigation_data, get_temporary_file, \
+    write_compiled_data
 
 class NavigationCache:
+    """
+    All-pairs shortest path data of a map, as compiled into the Maps/*.nac files.
+
+    The data is kept as the flat byte buffer stored in the file: a 5 byte header (width, height, width, height, 2)
+    followed by a (next direction index, distance) pair for every (position, target) pair.
+    """
     def __init__(self):
-        self.navigation_data = []
+        self.navigation_data = b""
+        self.dimensions = (0, 0, 0, 0, 0)
         self.loaded = False
+        self.loading_thread = None
 
     def deserialize_nav_data(self, array):
-        d1 = array[0]
-        d2 = array[1]
-        d3 = array[2]
-        d4 = array[3]
-        d5 = array[4]
-
-        data = [[[[[[] for i5 in range(d5)] for i4 in range(d4)] for i3 in range(d3)] for i2 in range(d2)] for i1 in range(d1)]
-        for i1 in range(d1):
-            for i2 in range(d2):
-                for i3 in range(d3):
-                    for i4 in range(d4):
-                        for i5 in range(d5):
-                            index = 5 + i1 * d2 * d3 * d4 * d5 + i2 * d3 * d4 * d5 + i3 * d4 * d5 + i4 * d5 + i5
-                            data[i1][i2][i3][i4][i5] = [array[index]]
-
-        return data
+        """
+        Returns a flat view of raw compiled data, and sets up the strides used to index it.
 
-    def load_compiled_data(self, file):
+        :param array: raw bytes of the compiled data (including the header).
+        :rtype: memoryview
+        """
+        d1, d2, d3, d4, d5 = self.dimensions = tuple(array[:5])
+        if len(array) != 5 + d1 * d2 * d3 * d4 * d5:
+            raise EOFError("Expected " + str(5 + d1 * d2 * d3 * d4 * d5) + " bytes, got " + str(len(array)))
+        self._position_x_stride = d2 * d3 * d4 * d5
+        self._position_y_stride = d3 * d4 * d5
+        self._target_x_stride = d4 * d5
+        self._target_y_stride = d5
+        return memoryview(array)
+
+    def read_compiled_data(self, file):
         with ZipFile(file) as zip_file:
             info = zip_file.getinfo("data")
 
@@ -36,13 +49,139 @@ class NavigationCache:
             if len(data) != expected_size:
                 raise EOFError("Expected " + str(expected_size) + " bytes, got " + str(len(data)))
 
-            self.navigation_data = self.deserialize_nav_data(data)
-            self.loaded = True
+            return data
+
+    def read_raw_data(self, file, raw_file):
+        """
+        Returns the raw data of a compiled file through a read-only memory map of an extracted copy.
+        The copy is (re)extracted when it is missing or older than the compiled file,
+        and the data is read directly from the compiled file if the copy cannot be written.
+
+        :param file: path of the .nac file.
+        :param raw_file: path of the extracted copy.
+        :rtype: mmap.mmap or bytes
+        """
+        if not os.path.isfile(raw_file) or os.path.getmtime(raw_file) < os.path.getmtime(file):
+            data = self.read_compiled_data(file)
+            try:
+                self.extract_raw_data(data, raw_file)
+            except OSError:
+                return data
+        with open(raw_file, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def extract_raw_data(self, data, raw_file):
+        temporary_file = get_temporary_file(raw_file)
+        try:
+            with open(temporary_file, 'wb') as f:
+                f.write(data)
+            os.replace(temporary_file, raw_file)
+        finally:
+            if os.path.exists(temporary_file):
+                os.remove(temporary_file)
+
+    def load_compiled_data(self, file):
+        self.navigation_data = self.deserialize_nav_data(self.read_compiled_data(file))
+        self.loaded = True
+
+    def load_compiled_data_in_background(self, file, tiles, raw_file=None, processes=1):
+        """
+        Starts loading a compiled navigation cache in a daemon thread.
+        The cache is only marked as loaded once it has been checked against the given tiles,
+        until then (or if the file cannot be read or was compiled for another map) PathFinder keeps using A*.
+        If the file is missing, the cache is compiled from the tiles and saved to it.
+
+        :param file: path of the .nac file.
+        :param tiles: tiles of the current map.
+        :param raw_file: optional path to extract the data to, memory-mapped on this and later runs.
+        :param processes: number of processes compiling a missing file, 1 (the default) to compile in this process
+                          rather than compete with the bot's turns for every core.
+        :return: the loading thread.
+        :rtype: threading.Thread
+        """
+        self.loaded = False
+        self.loading_thread = threading.Thread(target=self._load_and_check, args=(file, tiles, raw_file, processes),
+                                               daemon=True)
+        self.loading_thread.start()
+        return self.loading_thread
+
+    def _load_and_check(self, file, tiles, raw_file, processes):
+        if not os.path.isfile(file):
+            print("No navigation cache found at {0}, compiling it".format(file))
+            self._compile_and_save(file, tiles, processes)
+            return
+        try:
+            if raw_file is None:
+                data = self.read_compiled_data(file)
+            else:
+                data = self.read_raw_data(file, raw_file)
+        except (OSError, KeyError, EOFError, BadZipFile, ValueError) as e:
+            print("Could not read navigation cache {0} ({1}), using A* path finding".format(file, e), file=sys.stderr)
+            return
+
+        if not self.matches_tiles(data, tiles):
+            print("Navigation cache {0} does not match the current map, using A* path finding".format(file), file=sys.stderr)
+            return
+
+        self.navigation_data = self.deserialize_nav_data(data)
+        self.loaded = True
+
+    def _compile_and_save(self, file, tiles, processes):
+        try:
+            data = compile_navigation_data(tiles, processes)
+        except Exception as e:
+            print("Could not compile navigation cache {0} ({1}), using A* path finding".format(file, e),
+                  file=sys.stderr)
+            return
+        try:
+            write_compiled_data(data, file)
+        except OSError as e:
+            print("Could not save navigation cache {0} ({1})".format(file, e), file=sys.stderr)
+        self.navigation_data = self.deserialize_nav_data(data)
+        self.loaded = True
+
+    def matches_tiles(self, data, tiles):
+        """
+        Returns a boolean indicating whether raw compiled data was generated for the given tiles.
+        The dimensions must match, every pair of adjacent open tiles must be 1 step apart,
+        and walls must be unreachable.
+
+        :param data: raw bytes of the compiled data.
+        :param tiles: tiles of the current map.
+        :rtype: bool
+        """
+        width = len(tiles)
+        height = len(tiles[0])
+        if len(data) < 5 or tuple(data[:5]) != (width, height, width, height, 2) or \
+                len(data) != 5 + width * height * width * height * 2:
+            return False
+
+        for x in range(width):
+            for y in range(height):
+                for nx, ny in ((x + 1, y), (x, y + 1)):
+                    if nx >= width or ny >= height:
+                        continue
+                    expected = 0 if tiles[x][y] == TileType.WALL or tiles[nx][ny] == TileType.WALL else 1
+                    if data[5 + (((x * height + y) * width + nx) * height + ny) * 2 + 1] != expected:
+                        return False
+        return True
 
     def get_next_direction_in_path(self, position, target):
-        return Direction.INDEX_TO_DIRECTION[self.navigation_data[position[0]][position[1]][target[0]][target[1]][0][0]]
+        return Direction.INDEX_TO_DIRECTION[self.navigation_data[self._get_offset(position, target)]]
 
     def get_distance(self, position, target):
-        return self.navigation_data[position[0]][position[1]][target[0]][target[1]][1][0]
+        return self.navigation_data[self._get_offset(position, target) + 1]
+
+    def _get_offset(self, position, target):
+        return 5 + position[0] * self._position_x_stride + position[1] * self._position_y_stride + \
+               target[0] * self._target_x_stride + target[1] * self._target_y_stride
+
+navigation_cache = NavigationCache()
+
 
-navigation_cache = NavigationCache()
\ No newline at end of file
+def load_navigation_cache(tiles):
+    # Loaded in the background so the handshake is not delayed; path finding uses A* until it is ready.
+    # A missing cache is compiled in the calling process: an AIWorker's process is daemonic and cannot start a pool
+    if constants.MAP_NAME:
+        cache_file = os.path.join(constants.MAPS_DIRECTORY, constants.MAP_NAME + ".nac")
+        navigation_cache.load_compiled_data_in_background(cache_file, tiles, cache_file + ".raw", processes=1)
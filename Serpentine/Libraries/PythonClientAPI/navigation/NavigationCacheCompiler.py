@@ -0,0 +1,211 @@
+import os
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from PythonClientAPI.game.Enums import Direction, TileType
+
+MAX_DISTANCE = 255
+WALL_COLOUR = (0, 0, 0)
+
+# Open neighbours of every tile of the map being compiled, set up once per worker process
+_neighbours = []
+
+
+def read_bitmap_colours(file):
+    """
+    Returns the (r, g, b) colour of every pixel of an uncompressed 8, 24 or 32 bit bitmap (Maps/*.bmp).
+    The top left pixel is point (0, 0), x grows to the right and y grows downwards.
+
+    :param file: path of the bitmap.
+    :return: list of columns of (r, g, b) tuples.
+    :rtype: list
+    """
+    with open(file, 'rb') as f:
+        data = f.read()
+
+    if data[:2] != b'BM':
+        raise ValueError("{0} is not a bitmap".format(file))
+
+    pixel_offset = struct.unpack_from('<I', data, 10)[0]
+    header_size = struct.unpack_from('<I', data, 14)[0]
+    width, height = struct.unpack_from('<ii', data, 18)
+    bits_per_pixel = struct.unpack_from('<H', data, 28)[0]
+    compression = struct.unpack_from('<I', data, 30)[0]
+    palette_size = struct.unpack_from('<I', data, 46)[0]
+
+    if compression != 0:
+        raise ValueError("Compressed bitmaps are not supported")
+
+    top_down = height < 0
+    height = abs(height)
+    row_size = (width * bits_per_pixel + 31) // 32 * 4
+
+    if bits_per_pixel == 8:
+        palette_offset = 14 + header_size
+        palette_size = palette_size or 256
+        palette = [tuple(reversed(data[palette_offset + 4 * i:palette_offset + 4 * i + 3])) for i in range(palette_size)]
+
+        def colour_at(offset):
+            return palette[data[offset]]
+    elif bits_per_pixel in (24, 32):
+        bytes_per_pixel = bits_per_pixel // 8
+
+        def colour_at(offset):
+            return tuple(reversed(data[offset:offset + 3]))
+    else:
+        raise ValueError("Unsupported bitmap depth: {0} bits per pixel".format(bits_per_pixel))
+
+    colours = [[None] * height for x in range(width)]
+    for y in range(height):
+        row = y if top_down else height - 1 - y
+        for x in range(width):
+            if bits_per_pixel == 8:
+                offset = pixel_offset + row * row_size + x
+            else:
+                offset = pixel_offset + row * row_size + x * bytes_per_pixel
+            colours[x][y] = colour_at(offset)
+    return colours
+
+
+def read_bitmap_tiles(file):
+    """
+    Returns the tiles of a map stored as a bitmap (Maps/*.bmp), black pixels being walls.
+    The top left pixel is point (0, 0), x grows to the right and y grows downwards.
+
+    :param file: path of the bitmap.
+    :return: list of columns of TileType.
+    :rtype: list
+    """
+    return [[TileType.WALL if colour == WALL_COLOUR else TileType.TILE for colour in column]
+            for column in read_bitmap_colours(file)]
+
+
+def compile_navigation_data(tiles, processes=None):
+    """
+    Returns the raw all-pairs navigation data of a map, in the format read by NavigationCache.
+
+    One breadth-first search is run from every open tile, spread over a process pool.
+    Wall tiles and unreachable pairs get a distance of 0 and no direction.
+
+    :param tiles: list of columns of TileType.
+    :param processes: number of worker processes, 1 to compile in this process, None to use every core.
+    :return: header followed by a (direction index, distance) pair for every (position, target) pair.
+    :rtype: bytearray
+    """
+    width = len(tiles)
+    height = len(tiles[0])
+    size = width * height
+    walls = bytes(1 if tiles[x][y] == TileType.WALL else 0 for x in range(width) for y in range(height))
+    targets = [index for index in range(size) if not walls[index]]
+
+    data = bytearray(5 + size * size * 2)
+    data[:5] = bytes((width, height, width, height, 2))
+
+    if processes == 1:
+        _set_up_worker(walls, width, height)
+        results = map(_compile_target, targets)
+    else:
+        executor = ProcessPoolExecutor(max_workers=processes, initializer=_set_up_worker,
+                                       initargs=(walls, width, height))
+        results = executor.map(_compile_target, targets, chunksize=max(1, len(targets) // 64))
+
+    try:
+        # Entry (position, target) lives at 5 + (position * size + target) * 2,
+        # so the column of one target is a slice with a step of 2 * size
+        for target, directions, distances in results:
+            data[5 + target * 2::size * 2] = directions
+            data[6 + target * 2::size * 2] = distances
+    finally:
+        if processes != 1:
+            executor.shutdown()
+
+    return data
+
+
+def _set_up_worker(walls, width, height):
+    global _neighbours
+    _neighbours = [[] for index in range(width * height)]
+    for x in range(width):
+        for y in range(height):
+            if walls[x * height + y]:
+                continue
+            for direction in Direction.ORDERED_DIRECTIONS:
+                nx, ny = direction.move_point((x, y))
+                if 0 <= nx < width and 0 <= ny < height and not walls[nx * height + ny]:
+                    _neighbours[x * height + y].append((Direction.DIRECTION_TO_INDEX[direction], nx * height + ny))
+
+
+def _compile_target(target):
+    size = len(_neighbours)
+    distances = [-1] * size
+    distances[target] = 0
+    frontier = [target]
+    while frontier:
+        next_frontier = []
+        for index in frontier:
+            distance = distances[index] + 1
+            for direction_index, neighbour in _neighbours[index]:
+                if distances[neighbour] < 0:
+                    distances[neighbour] = distance
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+
+    direction_bytes = bytearray(size)
+    distance_bytes = bytearray(size)
+    for index in range(size):
+        distance = distances[index]
+        if distance <= 0:
+            continue
+        if distance > MAX_DISTANCE:
+            raise ValueError("Distance of {0} does not fit in the navigation cache format".format(distance))
+        distance_bytes[index] = distance
+        # Neighbours are listed in Direction.ORDERED_DIRECTIONS order, the first one closer to the target wins
+        for direction_index, neighbour in _neighbours[index]:
+            if distances[neighbour] == distance - 1:
+                direction_bytes[index] = direction_index
+                break
+
+    return target, bytes(direction_bytes), bytes(distance_bytes)
+
+
+def get_temporary_file(file):
+    """
+    Returns a path to write file to before renaming it, unique to the calling process and thread,
+    so processes writing the same file at once (e.g. the workers of a tournament) never read a partial copy.
+
+    :param file: path of the file to write.
+    :rtype: str
+    """
+    return "{0}.{1}.{2}.tmp".format(file, os.getpid(), threading.get_ident())
+
+
+def write_compiled_data(data, file):
+    """
+    Writes raw navigation data to a compiled (.nac) file, through a temporary file renamed once complete.
+
+    :param data: raw navigation data, as returned by compile_navigation_data.
+    :param file: path of the .nac file.
+    :return: void
+    """
+    temporary_file = get_temporary_file(file)
+    try:
+        with ZipFile(temporary_file, 'w', ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("data", bytes(data))
+        os.replace(temporary_file, file)
+    finally:
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
+
+
+def compile_map(bitmap_file, file, processes=None):
+    """
+    Compiles the navigation cache of a map bitmap into a .nac file.
+
+    :param bitmap_file: path of the map bitmap.
+    :param file: path of the .nac file to write.
+    :param processes: number of worker processes, None to use every core.
+    :return: void
+    """
+    write_compiled_data(compile_navigation_data(read_bitmap_tiles(bitmap_file), processes), file)
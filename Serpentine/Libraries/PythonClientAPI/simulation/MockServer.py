@@ -0,0 +1,182 @@
+import asyncio
+import json
+import time
+
+from PythonClientAPI.comm.Signals import Signals
+from PythonClientAPI.simulation.Simulator import Simulator, TURN_LIMIT
+from PythonClientAPI.structures.Statistics import get_percentile, PERCENTILES
+
+STRING_ENCODING = 'utf-8'
+RESPONSE_TIMEOUT = 10
+
+
+class MockSession:
+    """
+    Record of one client's game on the MockServer.
+
+    :ivar str uuid: uuid the client sent after BEGIN.
+    :ivar list round_trip_times: seconds between sending the state and receiving the move, every turn.
+    :ivar int no_responses: number of turns the client answered NO_RESPONSE.
+    :ivar int invalid_responses: number of turns the client's answer could not be read as a move.
+    :ivar str error: why the session stopped early, None if it played every turn.
+    """
+    def __init__(self, peer):
+        self.peer = peer
+        self.uuid = None
+        self.round_trip_times = []
+        self.no_responses = 0
+        self.invalid_responses = 0
+        self.error = None
+
+
+class MockServer:
+    """
+    asyncio stand-in for the game server (Snake.SPPServer.jar), speaking its length-prefixed protocol:
+    GET_READY and the tiles, READY, BEGIN, the client's uuid, then MOVE and the game state every turn, answered by
+    the client's move, and finally END.
+
+    Every connection plays its own game, so any number of clients (even with the same uuid) can be served at once.
+    Game states are either generated by a Simulator in which the client controls its team and the other teams
+    move at random, or replayed from a recording, in which case the client's moves are timed but ignored.
+    """
+    def __init__(self, bitmap_file=None, turn_limit=TURN_LIMIT, seed=None, recording=None, record_file=None):
+        """
+        :param bitmap_file: map bitmap of the simulated games.
+        :param turn_limit: number of turns of the simulated games.
+        :param seed: seed of the first simulated game, every session gets its own.
+        :param recording: path of a recording to replay instead of simulating games (see record_file).
+        :param record_file: path to record the first simulated game to: the tiles message then one state per line.
+        """
+        self.bitmap_file = bitmap_file
+        self.turn_limit = turn_limit
+        self.seed = seed
+        self.record_file = record_file
+        self.recorded_messages = None
+        if recording is not None:
+            with open(recording, encoding=STRING_ENCODING) as f:
+                self.recorded_messages = [line.rstrip('\n') for line in f if line.strip()]
+        self.sessions = []
+        self.finished_sessions = 0
+        self._all_sessions_finished = None
+        self._max_sessions = None
+
+    async def serve(self, host, port, max_sessions=None):
+        """
+        Serves clients until max_sessions games have been played, or forever.
+
+        :param host: host name to listen on.
+        :param port: port to listen on.
+        :param max_sessions: number of games to serve, None to serve forever.
+        :return: void
+        """
+        self._max_sessions = max_sessions
+        self._all_sessions_finished = asyncio.Event()
+        server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            if max_sessions is None:
+                await server.serve_forever()
+            else:
+                await self._all_sessions_finished.wait()
+
+    async def handle_client(self, reader, writer):
+        session = MockSession(writer.get_extra_info('peername'))
+        self.sessions.append(session)
+        try:
+            if self.recorded_messages is not None:
+                await self.replay_game(session, reader, writer)
+            else:
+                await self.simulate_game(session, reader, writer, len(self.sessions) - 1)
+            self.send_message(writer, Signals.END.name)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError) as e:
+            session.error = '{0}: {1}'.format(type(e).__name__, e)
+        finally:
+            writer.close()
+            self.finished_sessions += 1
+            if self._max_sessions is not None and self.finished_sessions >= self._max_sessions:
+                self._all_sessions_finished.set()
+
+    async def start_game(self, session, reader, writer, tiles_message):
+        self.send_message(writer, Signals.GET_READY.name)
+        self.send_message(writer, tiles_message)
+        ready = await self.receive_message(reader)
+        if ready != Signals.READY.name:
+            raise ValueError("Expected {0}, got {1}".format(Signals.READY.name, ready[:50]))
+        self.send_message(writer, Signals.BEGIN.name)
+        session.uuid = await self.receive_message(reader)
+
+    async def play_turn(self, session, reader, writer, state_message):
+        self.send_message(writer, Signals.MOVE.name)
+        self.send_message(writer, state_message)
+        await writer.drain()
+        start_time = time.perf_counter()
+        response = await self.receive_message(reader)
+        session.round_trip_times.append(time.perf_counter() - start_time)
+        if response == Signals.NO_RESPONSE.name:
+            session.no_responses += 1
+            return None
+        try:
+            unit_cores = json.loads(response)['uuidToUnitCoreMap']
+            point = unit_cores[session.uuid]['nextMovePoint']
+            return None if point is None else (point['x'], point['y'])
+        except (ValueError, KeyError, TypeError):
+            session.invalid_responses += 1
+            return None
+
+    async def simulate_game(self, session, reader, writer, game_index):
+        seed = None if self.seed is None else self.seed + game_index
+        simulator = Simulator.from_bitmap(self.bitmap_file, [None] * 4, load_navigation_cache=False,
+                                          turn_limit=self.turn_limit, seed=seed)
+        tiles_message = json.dumps({'tiles': [[tile.name for tile in column] for column in simulator.tiles]})
+        await self.start_game(session, reader, writer, tiles_message)
+
+        # The client plays the team named by its uuid, or the first team under its own uuid
+        units = [unit for unit in simulator.units if unit.uuid == session.uuid] or simulator.units[:1]
+        units[0].uuid = simulator.clients[simulator.units.index(units[0])].uuid = session.uuid
+
+        recorded_messages = [tiles_message] if self.record_file is not None and game_index == 0 else None
+        while not simulator.is_over():
+            state_message = json.dumps(simulator.get_game_state_dct())
+            if recorded_messages is not None:
+                recorded_messages.append(state_message)
+            move = await self.play_turn(session, reader, writer, state_message)
+            simulator.play_turn({session.uuid: move})
+
+        if recorded_messages is not None:
+            with open(self.record_file, 'w', encoding=STRING_ENCODING) as f:
+                f.write('\n'.join(recorded_messages) + '\n')
+
+    async def replay_game(self, session, reader, writer):
+        await self.start_game(session, reader, writer, self.recorded_messages[0])
+        for state_message in self.recorded_messages[1:]:
+            await self.play_turn(session, reader, writer, state_message)
+
+    def send_message(self, writer, message):
+        message_bytes = message.encode(STRING_ENCODING)
+        writer.write(len(message_bytes).to_bytes(4, 'big') + message_bytes)
+
+    async def receive_message(self, reader):
+        size = int.from_bytes(await asyncio.wait_for(reader.readexactly(4), RESPONSE_TIMEOUT), 'big')
+        message_bytes = await asyncio.wait_for(reader.readexactly(size), RESPONSE_TIMEOUT)
+        return message_bytes.decode(STRING_ENCODING).strip()
+
+    def get_summary(self, max_response_time):
+        """
+        Returns the round trip times of every session put together.
+
+        :param max_response_time: response time (in ms) above which a turn counts as a timeout.
+        :return: dictionary with the number of sessions, failed sessions, turns, NO_RESPONSE answers, invalid answers,
+                 timeouts and round trip percentiles (in ms).
+        :rtype: dict
+        """
+        times = sorted(t for session in self.sessions for t in session.round_trip_times)
+        summary = {'sessions': len(self.sessions),
+                   'failed': sum(1 for session in self.sessions if session.error is not None),
+                   'turns': len(times),
+                   'no_responses': sum(session.no_responses for session in self.sessions),
+                   'invalid_responses': sum(session.invalid_responses for session in self.sessions),
+                   'timeouts': sum(1 for t in times if t * 1000 > max_response_time),
+                   'round_trip_ms': {'p{0}'.format(percentile): get_percentile(times, percentile) * 1000
+                                     for percentile in PERCENTILES}}
+        summary['round_trip_ms']['max'] = times[-1] * 1000 if times else 0
+        return summary
@@ -0,0 +1,443 @@
+import importlib.util
+import os
+import random
+import sys
+import time
+import traceback
+from collections import deque
+
+import PythonClientAPI.game.JSON as JSON
+from PythonClientAPI.comm.TurnBudget import TurnBudget
+from PythonClientAPI.game.Enums import Team, Status, TileType
+from PythonClientAPI.game.MapLayout import MapLayout
+from PythonClientAPI.navigation.NavigationCache import navigation_cache
+from PythonClientAPI.navigation.NavigationCacheCompiler import read_bitmap_colours, WALL_COLOUR
+
+TURN_LIMIT = 300
+TURN_PENALTY = 25
+MAXIMUM_ALLOWED_RESPONSE_TIME = 600
+
+# Colour of the starting territory of every team on the map bitmaps,
+# the head of every team is the single differently coloured pixel inside its territory
+TEAM_COLOURS = {(255, 0, 0): Team.RED.name, (64, 64, 192): Team.BLUE.name,
+                (32, 192, 64): Team.GREEN.name, (160, 64, 192): Team.PURPLE.name}
+
+
+def read_bitmap_start_positions(file):
+    """
+    Returns the tiles and the starting head and territory of every team of a map bitmap (Maps/*.bmp).
+
+    :param file: path of the bitmap.
+    :return: tiles (list of columns of TileType) and dictionary of team to (head point, set of territory points).
+    :rtype: tuple
+    """
+    colours = read_bitmap_colours(file)
+    width = len(colours)
+    height = len(colours[0])
+    tiles = [[TileType.WALL if colour == WALL_COLOUR else TileType.TILE for colour in column] for column in colours]
+
+    territories = {team: set() for team in TEAM_COLOURS.values()}
+    for x in range(width):
+        for y in range(height):
+            if colours[x][y] in TEAM_COLOURS:
+                territories[TEAM_COLOURS[colours[x][y]]].add((x, y))
+
+    start_positions = {}
+    for team, territory in territories.items():
+        if not territory:
+            continue
+        # The head is the one tile enclosed by the territory that is not painted with the team's colour
+        heads = set((x + dx, y + dy) for x, y in territory for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                    if 0 <= x + dx < width and 0 <= y + dy < height and (x + dx, y + dy) not in territory and
+                    colours[x + dx][y + dy] not in TEAM_COLOURS and colours[x + dx][y + dy] != WALL_COLOUR and
+                    all((x + dx + nx, y + dy + ny) in territory for nx, ny in ((1, 0), (-1, 0), (0, 1), (0, -1))))
+        if len(heads) != 1:
+            raise ValueError("Could not find the starting position of {0} in {1}".format(team, file))
+        head = heads.pop()
+        start_positions[team] = (head, territory | {head})
+    return tiles, start_positions
+
+
+def load_player_ai(path):
+    """
+    Returns a new PlayerAI of a bot, loaded from its PlayerAI.py (or the directory holding it).
+    Every bot is loaded as its own module, so bots that all name their module PlayerAI can play together.
+
+    :param path: path of the bot's PlayerAI.py or of its directory.
+    :rtype: PlayerAI
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, 'PlayerAI.py')
+    module_name = 'PlayerAI_' + str(abs(hash(os.path.abspath(path))))
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[module_name] = module
+    return module.PlayerAI()
+
+
+class SimulatedUnit:
+    """
+    Server-side state of one unit.
+
+    :ivar str team: team of the unit.
+    :ivar str uuid: uuid of the player controlling the unit.
+    :ivar tuple position: head of the unit.
+    :ivar list trace: points of the unit's trace (body), in the order they were laid.
+    :ivar set territory: points of the unit's territory.
+    :ivar str status: name of the Status of the unit's last move.
+    :ivar int turn_penalty: turns left before a disabled unit respawns.
+    """
+    def __init__(self, team, uuid, position, territory):
+        self.team = team
+        self.uuid = uuid
+        self.position = position
+        self.trace = []
+        self.trace_points = set()
+        self.territory = set(territory)
+        self.status = Status.VALID_MOVE.name
+        self.turn_penalty = 0
+        self.disabled = False
+        self.permanently_disabled = False
+        self.kills = 0
+        self.deaths = 0
+
+    def add_trace(self, point):
+        self.trace.append(point)
+        self.trace_points.add(point)
+
+    def remove_trace(self, points):
+        if not self.trace_points.isdisjoint(points):
+            self.trace_points -= points
+            self.trace = [point for point in self.trace if point in self.trace_points]
+
+    def clear_trace(self):
+        self.trace = []
+        self.trace_points = set()
+
+    def as_dct(self):
+        """
+        Returns the unit as it appears in the playerUUIDToPlayerTypeMap of a game state message.
+
+        :rtype: dict
+        """
+        return {'playerUnit': {'team': self.team, 'uuid': self.uuid,
+                               'position': {'x': self.position[0], 'y': self.position[1]},
+                               'turnPenalty': self.turn_penalty},
+                'playerStatus': self.status,
+                'playerTrace': [{'x': x, 'y': y} for x, y in self.trace],
+                'playerTerritory': [{'x': x, 'y': y} for x, y in self.territory]}
+
+
+class SimulatedClient:
+    """
+    A PlayerAI playing in the simulator, with the World it sees and the time its moves took.
+    """
+    def __init__(self, player_ai, uuid):
+        self.player_ai = player_ai
+        self.uuid = uuid
+        self.world = None
+        self.move_times = []
+        self.errors = 0
+
+
+class Simulator:
+    """
+    Headless, in-process Serpentine game.
+
+    Every turn the game state is handed to each PlayerAI through JSON.as_game_state (so each bot keeps an
+    incrementally updated World like it does against the server), do_move is called directly, and the moves are
+    applied with the rules of the game server:
+
+    - a missing, non-adjacent or wall move is replaced by a random open neighbour (INVALID_MOVE / BLOCKED_BY_WALL),
+    - a unit outside its territory leaves a trace behind it,
+    - units moving onto the same tile all die unless the tile belongs to one of them, units swapping tiles both die,
+    - a unit moving onto a trace kills its owner (itself included),
+    - a unit returning to its territory captures its trace and every tile it encloses,
+    - a dead unit loses its trace and respawns in its territory after TURN_PENALTY turns,
+      a unit left without territory is disabled for good.
+
+    :ivar int turn: number of turns played.
+    :ivar list units: SimulatedUnit of every player, in player index order.
+    :ivar list clients: SimulatedClient of every player, in player index order.
+    """
+    def __init__(self, tiles, start_positions, player_ais, turn_limit=TURN_LIMIT, turn_penalty=TURN_PENALTY,
+                 seed=None, max_response_time=MAXIMUM_ALLOWED_RESPONSE_TIME):
+        """
+        :param tiles: list of columns of TileType.
+        :param start_positions: dictionary of team to (head point, set of territory points).
+        :param player_ais: PlayerAI of every player, the i-th one playing the i-th team of Team.
+                           None for players whose moves are given to play_turn instead.
+        :param turn_limit: number of turns in a game.
+        :param turn_penalty: number of turns a dead unit waits before respawning.
+        :param seed: seed of the random choices (invalid moves and respawns).
+        :param max_response_time: response time (in ms) the bots' world.budget counts down from.
+                                  Slower moves are still played, the time is only measured.
+        """
+        self.tiles = tiles
+        self.layout = MapLayout(tiles)
+        self.turn_limit = turn_limit
+        self.turn_penalty = turn_penalty
+        self.max_response_time = max_response_time
+        self.random = random.Random(seed)
+        self.turn = 0
+        self.units = []
+        self.clients = []
+
+        teams = [team for team in Team.get_players() if team in start_positions]
+        if len(player_ais) > len(teams):
+            raise ValueError("The map only has starting positions for {0} players".format(len(teams)))
+        for team, player_ai in zip(teams, player_ais):
+            uuid = team.capitalize()
+            head, territory = start_positions[team]
+            self.units.append(SimulatedUnit(team, uuid, head, territory))
+            self.clients.append(SimulatedClient(player_ai, uuid))
+
+    @classmethod
+    def from_bitmap(cls, bitmap_file, player_ais, load_navigation_cache=True, **kwargs):
+        """
+        Returns a simulator playing on a map bitmap.
+
+        :param bitmap_file: path of the map bitmap (Maps/*.bmp).
+        :param player_ais: PlayerAI of every player.
+        :param load_navigation_cache: load the map's .nac (compiling it if missing) before the game, as the client does.
+        :rtype: Simulator
+        """
+        tiles, start_positions = read_bitmap_start_positions(bitmap_file)
+        if load_navigation_cache:
+            cache_file = os.path.splitext(bitmap_file)[0] + ".nac"
+            navigation_cache.load_compiled_data_in_background(cache_file, tiles, cache_file + ".raw").join()
+        return cls(tiles, start_positions, player_ais, **kwargs)
+
+    def get_game_state_dct(self):
+        """
+        Returns the current state in the format of the server's game state messages.
+
+        :rtype: dict
+        """
+        return {'playerUUIDToPlayerTypeMap': {unit.uuid: unit.as_dct() for unit in self.units},
+                'playerIndexToUUIDMap': {str(index): unit.uuid for index, unit in enumerate(self.units)}}
+
+    def run(self):
+        """
+        Plays the game until the turn limit, or until every unit is disabled for good.
+
+        :return: result of the game (see get_result).
+        :rtype: dict
+        """
+        while not self.is_over():
+            self.play_turn()
+        return self.get_result()
+
+    def is_over(self):
+        return self.turn >= self.turn_limit or all(unit.permanently_disabled for unit in self.units)
+
+    def play_turn(self, remote_moves=None):
+        """
+        Plays one turn.
+
+        :param remote_moves: optional dictionary of uuid to the point asked for by players without a PlayerAI
+                             (such as clients connected to the MockServer).
+        :return: void
+        """
+        moves = self.request_moves()
+        if remote_moves:
+            moves = [remote_moves.get(unit.uuid, move) for unit, move in zip(self.units, moves)]
+        self.move_units(self.validate_moves(moves))
+        self.respawn_units()
+        self.turn += 1
+
+    def request_moves(self):
+        """
+        Calls do_move of every PlayerAI on the current state.
+
+        :return: point every unit asked to move to (None if it did not move or raised an exception).
+        :rtype: list
+        """
+        state = self.get_game_state_dct()
+        moves = []
+        for client in self.clients:
+            if client.player_ai is None:
+                moves.append(None)
+                continue
+            budget = TurnBudget(time.monotonic(), self.max_response_time)
+            game_state = JSON.as_game_state(state, self.tiles, client.world, self.layout, client.uuid)
+            client.world = game_state.world
+            client.world.budget = budget
+            friendly_unit = game_state.player_uuid_to_player_type_map[client.uuid].friendly_unit
+            enemy_units = [game_state.player_uuid_to_player_type_map[uuid].friendly_unit
+                           for uuid in game_state.enemy_uuids]
+
+            start_time = time.perf_counter()
+            try:
+                client.player_ai.do_move(client.world, friendly_unit, enemy_units)
+            except Exception:
+                client.errors += 1
+                print("An exception occurred in calling do_move of {0}: \n".format(client.uuid), file=sys.stderr)
+                traceback.print_exc(file=sys.stderr)
+            client.move_times.append(time.perf_counter() - start_time)
+            moves.append(friendly_unit.next_move_target)
+        return moves
+
+    def validate_moves(self, moves):
+        """
+        Sets the status of every unit, and replaces invalid moves by a random open neighbour.
+        Disabled units do not move, and get one turn closer to respawning.
+
+        :param moves: point every unit asked to move to.
+        :return: point every enabled unit moves to (None for disabled units).
+        :rtype: list
+        """
+        next_points = []
+        for unit, move in zip(self.units, moves):
+            if unit.disabled:
+                unit.status = Status.DISABLED.name
+                if not unit.permanently_disabled:
+                    unit.turn_penalty -= 1
+                next_points.append(None)
+                continue
+
+            neighbours = self.layout.open_neighbour_maps[self.layout.get_index(unit.position)]
+            if move is not None and tuple(move) in neighbours.values():
+                unit.status = Status.VALID_MOVE.name
+                next_points.append(tuple(move))
+                continue
+
+            x, y = unit.position
+            adjacent = move is not None and abs(move[0] - x) + abs(move[1] - y) == 1
+            unit.status = Status.BLOCKED_BY_WALL.name if adjacent else Status.INVALID_MOVE.name
+            next_points.append(self.random.choice(list(neighbours.values())) if neighbours else unit.position)
+        return next_points
+
+    def move_units(self, next_points):
+        """
+        Moves every enabled unit, then resolves collisions, attacks and captures.
+
+        :param next_points: point every enabled unit moves to (None for disabled units).
+        :return: void
+        """
+        movers = [(unit, point) for unit, point in zip(self.units, next_points) if point is not None]
+        old_positions = {unit.team: unit.position for unit, point in movers}
+        for unit, point in movers:
+            if unit.position not in unit.territory:
+                unit.add_trace(unit.position)
+            unit.position = point
+
+        # Dead unit to the unit credited with the kill (None for suicides and head-to-head collisions)
+        killed = {}
+        positions = {}
+        for unit, point in movers:
+            positions.setdefault(point, []).append(unit)
+        for point, units in positions.items():
+            if len(units) > 1:
+                owners = [unit for unit in units if point in unit.territory]
+                for unit in units:
+                    if len(owners) != 1 or unit is not owners[0]:
+                        killed[unit.team] = (unit, owners[0] if len(owners) == 1 else None)
+
+        for i, (unit, point) in enumerate(movers):
+            for other, other_point in movers[i + 1:]:
+                if point == old_positions[other.team] and other_point == old_positions[unit.team]:
+                    killed[unit.team] = (unit, None)
+                    killed[other.team] = (other, None)
+
+        for unit, point in movers:
+            if unit.team in killed:
+                continue
+            for victim in self.units:
+                if not victim.disabled and point in victim.trace_points:
+                    killed.setdefault(victim.team, (victim, None if victim is unit else unit))
+
+        for victim, killer in killed.values():
+            self._kill(victim)
+            if killer is not None:
+                killer.kills += 1
+
+        for unit, point in movers:
+            if not unit.disabled and unit.trace and point in unit.territory:
+                self._capture(unit)
+
+        for unit in self.units:
+            if not unit.territory and not unit.permanently_disabled:
+                # A unit already killed (this turn or before) loses its last territory without dying again
+                if not unit.disabled:
+                    self._kill(unit)
+                    unit.turn_penalty = 0
+                unit.permanently_disabled = True
+
+    def respawn_units(self):
+        occupied = set(unit.position for unit in self.units if not unit.disabled)
+        for unit in self.units:
+            if unit.disabled and not unit.permanently_disabled and unit.turn_penalty <= 0:
+                free_points = sorted(unit.territory - occupied) or sorted(unit.territory)
+                unit.position = self.random.choice(free_points)
+                unit.disabled = False
+                unit.turn_penalty = 0
+                unit.status = Status.RESPAWNED.name
+                occupied.add(unit.position)
+
+    def _kill(self, unit):
+        unit.clear_trace()
+        unit.disabled = True
+        unit.turn_penalty = self.turn_penalty
+        unit.status = Status.DISABLED.name
+        unit.deaths += 1
+
+    def _capture(self, unit):
+        captured = unit.trace_points | self._get_enclosed_points(unit.territory | unit.trace_points)
+        unit.territory |= captured
+        unit.clear_trace()
+        for other in self.units:
+            if other is not unit:
+                other.territory -= captured
+                other.remove_trace(captured)
+
+    def _get_enclosed_points(self, territory):
+        """
+        Returns the open points that cannot reach the outside of the territory's bounding box without crossing it.
+
+        :param territory: set of territory points.
+        :rtype: set
+        """
+        min_x = min(x for x, y in territory)
+        max_x = max(x for x, y in territory)
+        min_y = min(y for x, y in territory)
+        max_y = max(y for x, y in territory)
+
+        outside = set()
+        queue = deque()
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                if (x in (min_x, max_x) or y in (min_y, max_y)) and (x, y) not in territory:
+                    outside.add((x, y))
+                    queue.append((x, y))
+        while queue:
+            x, y = queue.popleft()
+            for point in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if min_x <= point[0] <= max_x and min_y <= point[1] <= max_y and \
+                        point not in territory and point not in outside:
+                    outside.add(point)
+                    queue.append(point)
+
+        return set((x, y) for x in range(min_x + 1, max_x) for y in range(min_y + 1, max_y)
+                   if (x, y) not in territory and (x, y) not in outside and not self.layout.is_wall((x, y)))
+
+    def get_result(self):
+        """
+        Returns the result of the game so far.
+
+        :return: dictionary with the turns played, and per team the territory, kills, deaths, do_move durations
+                 (in seconds) and number of do_move exceptions, plus the winners (teams with the most territory).
+        :rtype: dict
+        """
+        territory = {unit.team: len(unit.territory) for unit in self.units}
+        most = max(territory.values()) if territory else 0
+        return {'turns': self.turn,
+                'territory': territory,
+                'kills': {unit.team: unit.kills for unit in self.units},
+                'deaths': {unit.team: unit.deaths for unit in self.units},
+                'move_times': {unit.team: client.move_times for unit, client in zip(self.units, self.clients)},
+                'errors': {unit.team: client.errors for unit, client in zip(self.units, self.clients)},
+                'winners': [team for team, count in territory.items() if count == most]}
@@ -0,0 +1,183 @@
+import ast
+import contextlib
+import io
+import itertools
+import json
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PythonClientAPI.simulation.Simulator import Simulator, load_player_ai, TURN_LIMIT, MAXIMUM_ALLOWED_RESPONSE_TIME
+from PythonClientAPI.structures.Statistics import get_percentile, PERCENTILES
+
+PLAYERS_PER_GAME = 4
+
+
+def parse_bot_spec(spec):
+    """
+    Splits a bot given as ``path`` or ``path:name=value,name=value`` into its path and parameter overrides.
+    Values are read as Python literals when possible, and kept as strings otherwise.
+
+    :param spec: bot specification.
+    :return: path of the bot and dictionary of attribute name to value to set on its PlayerAI.
+    :rtype: tuple
+    """
+    path, separator, overrides = spec.rpartition(':')
+    if not separator or '=' not in overrides:
+        return spec, {}
+    parameters = {}
+    for override in overrides.split(','):
+        name, value = override.split('=', 1)
+        try:
+            parameters[name.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            parameters[name.strip()] = value.strip()
+    return path, parameters
+
+
+def read_match_preset(file):
+    """
+    Returns the map name, turn limit and maximum response time of a match preset (MatchPresets/*.json).
+
+    :param file: path of the preset.
+    :rtype: dict
+    """
+    with open(file) as f:
+        dct = json.load(f)
+    return {'map': dct['mapName'],
+            'turn_limit': int(dct.get('turnLimit', TURN_LIMIT)),
+            'max_response_time': int(dct.get('maxResponseTime', MAXIMUM_ALLOWED_RESPONSE_TIME))}
+
+
+def schedule_round_robin(bots, maps, rounds=1, seed=0):
+    """
+    Returns the matches of a round robin: every group of 4 bots plays on every map, once per round,
+    seats rotating between rounds so that every bot gets to play from every corner.
+    With fewer than 4 bots, the bots fill the seats in turn.
+
+    :param bots: bot specifications (see parse_bot_spec).
+    :param maps: dictionaries with the bitmap file, turn limit and maximum response time of every map.
+    :param rounds: number of times every group plays on every map.
+    :param seed: seed of the first match, every match gets its own.
+    :return: list of match dictionaries, as taken by play_match.
+    :rtype: list
+    """
+    if len(bots) >= PLAYERS_PER_GAME:
+        groups = list(itertools.combinations(bots, PLAYERS_PER_GAME))
+    else:
+        groups = [tuple(itertools.islice(itertools.cycle(bots), PLAYERS_PER_GAME))]
+
+    matches = []
+    for round_index in range(rounds):
+        for group in groups:
+            seats = group[round_index % PLAYERS_PER_GAME:] + group[:round_index % PLAYERS_PER_GAME]
+            for game_map in maps:
+                matches.append(dict(game_map, bots=list(seats), seed=seed + len(matches)))
+    return matches
+
+
+def play_match(match):
+    """
+    Plays one match in this process. Bots that cannot be loaded or set up make the match fail
+    instead of raising, so a tournament keeps going.
+
+    :param match: dictionary with the bots, bitmap file, turn limit, maximum response time and seed of the match.
+    :return: result of Simulator.run with the bot playing each team, or the error that stopped the match.
+    :rtype: dict
+    """
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            player_ais = []
+            for spec in match['bots']:
+                path, parameters = parse_bot_spec(spec)
+                player_ai = load_player_ai(path)
+                for name, value in parameters.items():
+                    if not hasattr(player_ai, name):
+                        raise AttributeError("{0} has no parameter {1}".format(path, name))
+                    setattr(player_ai, name, value)
+                player_ais.append(player_ai)
+
+            simulator = Simulator.from_bitmap(match['bitmap'], player_ais, turn_limit=match['turn_limit'],
+                                              max_response_time=match['max_response_time'], seed=match['seed'])
+            result = simulator.run()
+    except Exception as e:
+        return dict(match, error='{0}: {1}'.format(type(e).__name__, e), traceback=traceback.format_exc())
+
+    result['bots'] = {unit.team: spec for unit, spec in zip(simulator.units, match['bots'])}
+    return dict(match, result=result)
+
+
+def summarize(matches, max_response_time=MAXIMUM_ALLOWED_RESPONSE_TIME):
+    """
+    Returns the standings of every bot over played matches.
+
+    A bot sitting in several seats of a match (with fewer than 4 bots) plays one game there: it wins if any of
+    its seats wins, and its territory, kills, deaths, errors and timeouts are added up over its seats.
+    A game won by several bots (tied on territory) counts as a fraction of a win for each of them.
+    Territory share is the bot's part of the territory held at the end of a game, averaged over its games.
+
+    :param matches: matches returned by play_match.
+    :param max_response_time: response time (in ms) above which a move counts as a timeout.
+    :return: dictionary of bot specification to its statistics.
+    :rtype: dict
+    """
+    standings = {}
+    move_times = {}
+    for match in matches:
+        if 'result' not in match:
+            continue
+        result = match['result']
+        total_territory = sum(result['territory'].values()) or 1
+        timeout = match.get('max_response_time', max_response_time) / 1000
+        winners = set(result['bots'][team] for team in result['winners'])
+        for spec in set(result['bots'].values()):
+            stats = standings.setdefault(spec, {'games': 0, 'wins': 0, 'territory_share': 0, 'kills': 0,
+                                                'deaths': 0, 'errors': 0, 'timeouts': 0})
+            stats['games'] += 1
+            if spec in winners:
+                stats['wins'] += 1 / len(winners)
+            for team in (team for team, team_spec in result['bots'].items() if team_spec == spec):
+                stats['territory_share'] += result['territory'][team] / total_territory
+                stats['kills'] += result['kills'][team]
+                stats['deaths'] += result['deaths'][team]
+                stats['errors'] += result['errors'][team]
+                stats['timeouts'] += sum(1 for move_time in result['move_times'][team] if move_time > timeout)
+                move_times.setdefault(spec, []).extend(result['move_times'][team])
+
+    for spec, stats in standings.items():
+        stats['win_rate'] = stats['wins'] / stats['games']
+        stats['territory_share'] /= stats['games']
+        times = sorted(move_times[spec])
+        stats['latency_ms'] = {'p{0}'.format(percentile): get_percentile(times, percentile) * 1000
+                               for percentile in PERCENTILES}
+        stats['latency_ms']['max'] = times[-1] * 1000 if times else 0
+    return standings
+
+
+def run_tournament(matches, processes=None, on_match_played=None):
+    """
+    Plays matches over a process pool.
+
+    :param matches: matches to play, as returned by schedule_round_robin.
+    :param processes: number of worker processes, None to use every core.
+    :param on_match_played: optional function called with every match as soon as it is played.
+    :return: report with the standings of every bot, the failed matches and every played match.
+    :rtype: dict
+    """
+    played = []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(play_match, match) for match in matches]
+        for future in as_completed(futures):
+            match = future.result()
+            played.append(match)
+            if on_match_played is not None:
+                on_match_played(match)
+
+    played.sort(key=lambda match: match['seed'])
+    standings = summarize(played)
+    # Per-move timings are only kept in the standings, they would make up most of the report otherwise
+    for match in played:
+        if 'result' in match:
+            del match['result']['move_times']
+    return {'standings': standings,
+            'failed': [match for match in played if 'error' in match],
+            'matches': played}
@@ -1,4 +1,5 @@
 import heapq
+from collections import deque
 
 
 class PriorityQueue:
@@ -19,13 +20,13 @@ class PriorityQueue:
 
 class Queue:
     def __init__(self):
-        self.items = []
+        self.items = deque()
 
     def is_empty(self):
         return len(self.items) == 0
 
     def poll(self):
-        return self.items.pop(0)
+        return self.items.popleft()
 
     def add(self, item):
         self.items.append(item)
@@ -0,0 +1,16 @@
+# Percentiles reported by the tournament, the mock server and the client's timings
+PERCENTILES = (50, 95, 99)
+
+
+def get_percentile(sorted_values, percentile):
+    """
+    Returns a percentile of sorted values, using the nearest rank.
+
+    :param sorted_values: values sorted in increasing order.
+    :param percentile: percentile between 0 and 100.
+    :rtype: float
+    """
+    if not sorted_values:
+        return 0
+    rank = max(1, -(-len(sorted_values) * percentile // 100))
+    return sorted_values[int(rank) - 1]
@@ -0,0 +1,36 @@
+import argparse
+import asyncio
+import json
+import os
+
+import PythonClientAPI.comm.CommunicationConstants as cc
+from PythonClientAPI.simulation.MockServer import MockServer
+from PythonClientAPI.simulation.Simulator import TURN_LIMIT
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serves simulated or recorded games to Python clients over the game "
+                                                 "server's socket protocol, without the Java server.")
+    parser.add_argument('-m', '--map', default='Standard', help="map in Maps/ (or path of a map bitmap) to simulate")
+    parser.add_argument('-t', '--turns', type=int, default=TURN_LIMIT, help="number of turns of the simulated games")
+    parser.add_argument('--port', type=int, default=cc.PORT_NUMBER, help="port to listen on")
+    parser.add_argument('-s', '--seed', type=int, default=None, help="seed of the first simulated game")
+    parser.add_argument('-n', '--sessions', type=int, default=None,
+                        help="stop after this many games and print a summary, serve forever by default")
+    parser.add_argument('--max-response-time', type=int, default=cc.MAXIMUM_ALLOWED_RESPONSE_TIME,
+                        help="round trip (in ms) above which a turn counts as a timeout in the summary")
+    parser.add_argument('--record', default=None, help="file to record the first simulated game to")
+    parser.add_argument('--replay', default=None, help="recording to replay instead of simulating games")
+    args = parser.parse_args()
+
+    bitmap_file = args.map if os.path.isfile(args.map) else os.path.join(os.getcwd(), 'Maps', args.map + '.bmp')
+    server = MockServer(bitmap_file, args.turns, args.seed, args.replay, args.record)
+    print("Mock server listening on port {0}".format(args.port))
+    try:
+        asyncio.run(server.serve(cc.HOST_NAME, args.port, args.sessions))
+    except KeyboardInterrupt:
+        pass
+
+    print(json.dumps(server.get_summary(args.max_response_time), indent=2))
+    for session in server.sessions:
+        if session.error is not None:
+            print("Session of {0} failed: {1}".format(session.uuid or session.peer, session.error))
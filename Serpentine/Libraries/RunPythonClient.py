@@ -5,6 +5,9 @@ import importlib
 import imp
 
 from PythonClientAPI.comm.ClientHandlerProtocol import *
+from PythonClientAPI.comm.AIWorker import AIWorker
+from PythonClientAPI.comm.AsyncClientHandlerProtocol import AsyncClientHandlerProtocol
+from PythonClientAPI.comm.TimingRecorder import TimingRecorder
 import PythonClientAPI.config.Constants as constants
 import PythonClientAPI.comm.CommunicationConstants as cc
 from PythonClientAPI.game.JSON import parse_config
@@ -42,6 +45,14 @@ if __name__ == '__main__':
             constants.LOCAL_PLAYER_UUID = sys.argv[i * 2 + 1]
         elif sys.argv[i * 2] == "-cp":
             constants.PLAYER_AI_PATH = sys.argv[i * 2 + 1]
+        elif sys.argv[i * 2] == "-w":
+            constants.AI_WORKER_MODE = sys.argv[i * 2 + 1]
+        elif sys.argv[i * 2] == "-p":
+            constants.CLIENT_PROTOCOL = sys.argv[i * 2 + 1]
+        elif sys.argv[i * 2] == "-ponder":
+            constants.PONDER = sys.argv[i * 2 + 1] == "on"
+        elif sys.argv[i * 2] == "-timings":
+            constants.TIMINGS_FILE = sys.argv[i * 2 + 1]
 
     if player_index == -1:
         if constants.LOCAL_PLAYER_UUID == "Red":
@@ -60,6 +71,7 @@ if __name__ == '__main__':
     file = open(cwd + 'MatchPresets/' + config_name + ".json", 'r')
 
     parse_config(file.read(), player_index)
+    constants.MAPS_DIRECTORY = cwd + 'Maps/'
 
     try:
         sys.path.append(constants.PLAYER_AI_PATH)
@@ -77,7 +89,17 @@ if __name__ == '__main__':
     fp, pathname, description = imp.find_module('PlayerAI', [constants.PLAYER_AI_PATH])
     player_ai_module = imp.load_module('PlayerAI', fp, pathname, description)
     client_ai = player_ai_module.PlayerAI()
-    client_handler_protocol = ClientHandlerProtocol(client_ai, cc.PORT_NUMBER, cc.MAXIMUM_ALLOWED_RESPONSE_TIME,
-                                                    UUIDForAi)
+    timing_recorder = TimingRecorder(constants.TIMINGS_FILE) if constants.TIMINGS_FILE else None
+    if constants.CLIENT_PROTOCOL == "async":
+        client_handler_protocol = AsyncClientHandlerProtocol(client_ai, cc.PORT_NUMBER,
+                                                             cc.MAXIMUM_ALLOWED_RESPONSE_TIME, UUIDForAi,
+                                                             ponder=constants.PONDER, timing_recorder=timing_recorder)
+    else:
+        ai_worker = None
+        if constants.AI_WORKER_MODE != "none":
+            ai_worker = AIWorker(client_ai, constants.AI_WORKER_MODE, constants.PONDER)
+            ai_worker.start()
+        client_handler_protocol = ClientHandlerProtocol(client_ai, cc.PORT_NUMBER, cc.MAXIMUM_ALLOWED_RESPONSE_TIME,
+                                                        UUIDForAi, ai_worker, timing_recorder)
 
     client_handler_protocol.start_communications()
@@ -0,0 +1,39 @@
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from PythonClientAPI.simulation.Simulator import Simulator, load_player_ai, TURN_LIMIT, \
+    MAXIMUM_ALLOWED_RESPONSE_TIME
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Plays a game between bots in-process, without the game server.")
+    parser.add_argument('bots', nargs='+', help="PlayerAI.py (or directory holding it) of every player, up to 4")
+    parser.add_argument('-m', '--map', default='Standard', help="name of the map in Maps/, or path of a map bitmap")
+    parser.add_argument('-t', '--turns', type=int, default=TURN_LIMIT, help="number of turns in the game")
+    parser.add_argument('-r', '--max-response-time', type=int, default=MAXIMUM_ALLOWED_RESPONSE_TIME,
+                        help="response time (in ms) the bots' world.budget counts down from")
+    parser.add_argument('-s', '--seed', type=int, default=None, help="seed of the random choices of the game")
+    parser.add_argument('-v', '--verbose', action='store_true', help="show what the bots print")
+    args = parser.parse_args()
+
+    bitmap_file = args.map if os.path.isfile(args.map) else os.path.join(os.getcwd(), 'Maps', args.map + '.bmp')
+    player_ais = [load_player_ai(bot) for bot in args.bots]
+
+    start_time = time.time()
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+        simulator = Simulator.from_bitmap(bitmap_file, player_ais, turn_limit=args.turns,
+                                          max_response_time=args.max_response_time, seed=args.seed)
+        result = simulator.run()
+    elapsed_time = time.time() - start_time
+
+    print("Played {0} turns in {1} ms".format(result['turns'], round(elapsed_time * 1000)))
+    for unit, bot in zip(simulator.units, args.bots):
+        times = sorted(result['move_times'][unit.team]) or [0]
+        print("{0} ({1}): {2} tiles, {3} kills, {4} deaths, {5} errors, median move {6} ms".format(
+            unit.team, bot, result['territory'][unit.team], result['kills'][unit.team],
+            result['deaths'][unit.team], result['errors'][unit.team], round(times[len(times) // 2] * 1000, 1)))
+    print("Winner: {0}".format(", ".join(result['winners'])))
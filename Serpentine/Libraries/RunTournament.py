@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import time
+
+from PythonClientAPI.simulation.Tournament import read_match_preset, schedule_round_robin, run_tournament, \
+    MAXIMUM_ALLOWED_RESPONSE_TIME
+from PythonClientAPI.simulation.Simulator import TURN_LIMIT
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Plays a round robin tournament between bots with the in-process "
+                                                 "simulator, spread over a process pool.")
+    parser.add_argument('bots', nargs='+',
+                        help="PlayerAI.py (or directory holding it) of every bot, optionally followed by parameter "
+                             "overrides, e.g. Bots/BestBot:expansion_depth=4,attack_range=3")
+    parser.add_argument('-c', '--config', action='append', default=[],
+                        help="match preset in MatchPresets/ (or path of one) to play, can be repeated")
+    parser.add_argument('-m', '--map', action='append', default=[],
+                        help="map in Maps/ (or path of a map bitmap) to play with the default settings, can be repeated")
+    parser.add_argument('-r', '--rounds', type=int, default=1, help="number of times every group plays every map")
+    parser.add_argument('-s', '--seed', type=int, default=0, help="seed of the first match")
+    parser.add_argument('-p', '--processes', type=int, default=None,
+                        help="number of worker processes, defaults to every core")
+    parser.add_argument('-o', '--output', default='tournament.json', help="file to write the full report to")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    maps = []
+    for config in args.config:
+        preset = read_match_preset(config if os.path.isfile(config) else
+                                   os.path.join(cwd, 'MatchPresets', config + '.json'))
+        maps.append(preset)
+    for map_name in args.map:
+        maps.append({'map': map_name, 'turn_limit': TURN_LIMIT, 'max_response_time': MAXIMUM_ALLOWED_RESPONSE_TIME})
+    if not maps:
+        maps.append({'map': 'Standard', 'turn_limit': TURN_LIMIT, 'max_response_time': MAXIMUM_ALLOWED_RESPONSE_TIME})
+    for game_map in maps:
+        name = game_map['map']
+        game_map['bitmap'] = name if os.path.isfile(name) else os.path.join(cwd, 'Maps', name + '.bmp')
+
+    matches = schedule_round_robin(args.bots, maps, args.rounds, args.seed)
+
+    def on_match_played(match):
+        if 'error' in match:
+            print("Match {0} failed: {1}".format(match['seed'], match['error']))
+        else:
+            print("Match {0} on {1}: won by {2}".format(match['seed'], match['map'], ", ".join(
+                match['result']['bots'][team] for team in match['result']['winners'])))
+
+    start_time = time.time()
+    report = run_tournament(matches, args.processes, on_match_played)
+    print("Played {0} matches in {1} s, {2} failed".format(len(matches), round(time.time() - start_time, 1),
+                                                           len(report['failed'])))
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    standings = sorted(report['standings'].items(), key=lambda item: item[1]['win_rate'], reverse=True)
+    for spec, stats in standings:
+        latency = stats['latency_ms']
+        print("{0}: {1:.0%} wins over {2} games, {3:.0%} territory, {4} kills, {5} deaths, {6} errors, "
+              "{7} timeouts, move p50 {8:.1f} ms, p95 {9:.1f} ms, p99 {10:.1f} ms, max {11:.1f} ms".format(
+                  spec, stats['win_rate'], stats['games'], stats['territory_share'], stats['kills'], stats['deaths'],
+                  stats['errors'], stats['timeouts'], latency['p50'], latency['p95'], latency['p99'], latency['max']))